@@ -8,11 +8,20 @@ import networkx as nx
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Iterable, Union
-from functools import wraps  # performance_monitor装饰器需要
+from functools import wraps, reduce  # performance_monitor装饰器、_infer_indent_unit需要
 import time  # performance_monitor装饰器需要
 import logging  # 日志系统需要
+import queue, atexit  # 异步日志队列需要
+from logging.handlers import QueueHandler, QueueListener
 import traceback  # show_detailed_error方法需要
-from collections import defaultdict  # _SpatialHash和MindMapScene需要
+from collections import defaultdict, deque  # _SpatialHash、MindMapScene与撤销栈需要
+from itertools import product, islice  # _SpatialHash._keys_for、_largest_gap需要
+from operator import sub  # _largest_gap_mid需要
+from bisect import bisect_left, bisect_right  # parse_outline、_angle_candidates需要
+try:
+    import orjson  # 可选依赖：更快的 JSON 编解码，缺失时回退标准库
+except ImportError:
+    orjson = None
 
 from PyQt5.QtCore import (
     Qt, QTimer, QPoint, QByteArray, pyqtSignal, QEvent, QSettings, 
@@ -20,7 +29,8 @@ from PyQt5.QtCore import (
 )
 from PyQt5.QtGui import (
     QFont, QColor, QPalette, QFontDatabase, QKeySequence, QIcon, 
-    QPainter, QPen, QBrush, QLinearGradient, QPainterPath, QTransform, QGuiApplication, QFontMetrics
+    QPainter, QPen, QBrush, QLinearGradient, QPainterPath, QTransform, QGuiApplication, QFontMetrics,
+    QPixmap, QStaticText
 )
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QSplitter, QTextEdit,
@@ -34,65 +44,156 @@ from PyQt5.QtWidgets import (
 )
 
 
+def _pack_cell(ix: int, iy: int) -> int:
+    """把格子坐标 (ix, iy) 压成单个整数键，省去元组分配与组合哈希。"""
+    return (ix << 32) | (iy & 0xFFFFFFFF)
+
+
+def _ring_ordered_offsets(shape):
+    """相对本格的跨度 (dx0, dx1, dy0, dy1) 内全部格偏移，按 (切比雪夫环, 曼哈顿距离) 排序。"""
+    dx0, dx1, dy0, dy1 = shape
+    return tuple(sorted(product(range(dx0, dx1 + 1), range(dy0, dy1 + 1)),
+                        key=lambda d: (max(abs(d[0]), abs(d[1])), abs(d[0]) + abs(d[1]))))
+
+# 跨度形状 -> 排好序的格偏移；形状只与 r/cell 及查询点在格内的位置有关，种类很少
+_RING_ORDER: Dict[Tuple[int, int, int, int], Tuple[Tuple[int, int], ...]] = {}
+
+
 class _SpatialHash:
+    __slots__ = ("cell", "grid", "radius", "gen", "active")
+
     def __init__(self, cell=120):
-        from collections import defaultdict
         self.cell = max(40, int(cell))
-        self.grid = defaultdict(set)   # (ix,iy) -> {name}
+        self.grid = defaultdict(list)  # packed(ix,iy) -> [(name, gen)]，旧条目惰性失效
         self.radius = {}               # name -> approx radius
+        self.gen = {}                  # name -> 当前代数
+        self.active = set()            # 仍在索引中的 name
+
+    def _span(self, x, y, r):
+        c = self.cell
+        return int((x - r) // c), int((x + r) // c), int((y - r) // c), int((y + r) // c)
 
     def _keys_for(self, x, y, r):
+        return self._span_keys(self._span(x, y, r))
+
+    @staticmethod
+    def _span_keys(span):
+        x0, x1, y0, y1 = span
+        if x0 == x1 and y0 == y1:
+            return (_pack_cell(x0, y0),)
+        return [(ix << 32) | (iy & 0xFFFFFFFF) for ix, iy in product(range(x0, x1 + 1), range(y0, y1 + 1))]
+
+    def _keys_near_first(self, x, y, r):
+        """同 _keys_for，但按与查询点所在格的距离排序：本格 → 上下左右 → 对角 → 更外圈。"""
+        x0, x1, y0, y1 = span = self._span(x, y, r)
+        if x0 == x1 and y0 == y1:
+            return self._span_keys(span)
         c = self.cell
-        x0 = int((x - r) // c); x1 = int((x + r) // c)
-        y0 = int((y - r) // c); y1 = int((y + r) // c)
-        for ix in range(x0, x1 + 1):
-            for iy in range(y0, y1 + 1):
-                yield (ix, iy)
+        cx, cy = int(x // c), int(y // c)
+        # 排序只取决于跨度相对本格的形状，按形状缓存排好的偏移，查询时只做平移
+        shape = (x0 - cx, x1 - cx, y0 - cy, y1 - cy)
+        offsets = _RING_ORDER.get(shape)
+        if offsets is None:
+            offsets = _RING_ORDER[shape] = _ring_ordered_offsets(shape)
+        return [((cx + dx) << 32) | ((cy + dy) & 0xFFFFFFFF) for dx, dy in offsets]
+
+    def _bump(self, name):
+        g = self.gen.get(name, 0) + 1
+        self.gen[name] = g
+        return g
+
+    def _place(self, name, span):
+        entry = (name, self._bump(name))
+        grid = self.grid
+        for key in self._span_keys(span):
+            grid[key].append(entry)
 
     def insert(self, name, x, y, r):
         self.radius[name] = float(r)
-        for key in self._keys_for(x, y, r):
-            self.grid[key].add(name)
+        self.active.add(name)
+        self._place(name, self._span(x, y, r))
+
+    def rebuild(self, entries, cell=None):
+        """用 [(name, x, y, r)] 一次性重建：清空后批量登记，无旧条目需要作废。"""
+        if cell is not None:
+            self.cell = max(40, int(cell))
+        grid = self.grid = defaultdict(list)
+        radius = self.radius = {}
+        gen = self.gen = {}
+        active = self.active = set()
+        span = self._span
+        span_keys = self._span_keys
+        for name, x, y, r in entries:
+            radius[name] = float(r)
+            active.add(name)
+            gen[name] = 1
+            entry = (name, 1)
+            for key in span_keys(span(x, y, r)):
+                grid[key].append(entry)
 
     def remove(self, name, x, y):
-        r = self.radius.get(name, 0.0)
-        for key in list(self._keys_for(x, y, r)):
-            s = self.grid.get(key)
-            if s:
-                s.discard(name)
-                if not s:
-                    self.grid.pop(key, None)
+        # 只作废代数，不触碰格子；过期条目在查询时顺带压缩
+        self.active.discard(name)
+        self._bump(name)
         self.radius.pop(name, None)
 
     def move(self, name, oldx, oldy, newx, newy):
+        if name not in self.active:
+            return
         r = self.radius.get(name, 0.0)
-        old_keys = set(self._keys_for(oldx, oldy, r))
-        new_keys = set(self._keys_for(newx, newy, r))
-        for key in old_keys - new_keys:
-            s = self.grid.get(key)
-            if s:
-                s.discard(name)
-                if not s:
-                    self.grid.pop(key, None)
-        for key in new_keys - old_keys:
-            self.grid.setdefault(key, set()).add(name)
+        # 拖动时大多仍落在同一组格子里，无需重新登记
+        span = self._span(newx, newy, r)
+        if self._span(oldx, oldy, r) == span:
+            return
+        self._place(name, span)
+
+    def _compact(self, key):
+        gen_get = self.gen.get
+        live = [e for e in self.grid[key] if gen_get(e[0]) == e[1]]
+        if live:
+            self.grid[key] = live
+        else:
+            del self.grid[key]
+
+    def iter_neighbors(self, x, y, r):
+        """逐个产出候选 name（跨格节点可能重复），供只需遍历+判定的调用方使用。
+
+        由近及远遍历格子，最可能发生碰撞的候选最先产出，碰撞判定可尽早返回。
+        """
+        grid = self.grid
+        gen_get = self.gen.get
+        for key in self._keys_near_first(x, y, r):
+            bucket = grid.get(key)
+            if not bucket:
+                continue
+            stale = 0
+            for name, g in bucket:
+                if gen_get(name) == g:
+                    yield name
+                else:
+                    stale += 1
+            if stale * 2 > len(bucket):
+                self._compact(key)
 
     def neighbors(self, x, y, r):
-        hits = set()
-        for key in self._keys_for(x, y, r):
-            hits |= self.grid.get(key, set())
-        return hits
-
-
-# 配置日志系统
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(str(Path.home() / ".mindmap_debug.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+        return set(self.iter_neighbors(x, y, r))
+
+
+# 配置日志系统：GUI 线程只入队，文件/控制台写入交给后台监听线程
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler(str(Path.home() / ".mindmap_debug.log"), encoding='utf-8')
+_log_stream_handler = logging.StreamHandler()
+for _h in (_log_file_handler, _log_stream_handler):
+    _h.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+# 不经 basicConfig：它会给 QueueHandler 套上默认格式，prepare() 把格式化后的文本写回 msg，监听端再格式化一遍
+_log_queue_handler = QueueHandler(_log_queue)
+_root_logger = logging.getLogger()
+_root_logger.addHandler(_log_queue_handler)
+_root_logger.setLevel(logging.DEBUG)
+_log_listener = QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # 退出时排空队列
 logger = logging.getLogger("MindMap")
 
 # 使用实例变量替代全局常量
@@ -104,6 +205,101 @@ SETTINGS_PATH = str(Path.home() / ".mindmap_settings.json")
 # -----------------------------------------------------------
 APP_SETTINGS_PATH = str(Path.home() / ".mindmap_settings.json")
 
+# 主窗口样式表
+MAIN_WINDOW_STYLESHEET = """
+        QWidget { font-family: 'Segoe UI', 'Microsoft Yahei', 'PingFang SC', Arial; color:#203040; }
+        QMainWindow { background: #EEF3F9; }
+        #SidePanelLeft, #SidePanelRight { background: #F7FAFF; border: 1px solid #E3ECF7; border-radius: 14px; margin: 10px; }
+        QLabel { font-weight:600; color:#2A3D66; }
+        QPushButton { border: 1px solid #D6E2F1; padding: 10px 14px; margin: 8px 10px; min-height: 36px; border-radius: 10px; background: qlineargradient(x1:0,y1:0,x2:1,y2:1, stop:0 #ffffff, stop:1 #F3F8FF); }
+        QPushButton:hover { background: #EBF3FF; }
+        QPushButton:pressed { background: #E1ECFF; }
+        QLineEdit { margin: 8px 10px; padding: 8px 10px; border-radius: 8px; border: 1px solid #D6E2F1; background:#FFFFFF; }
+        QListWidget { margin: 8px 10px; border: 1px solid #D6E2F1; border-radius: 10px; background:#FFFFFF; }
+        QScrollBar:vertical { width: 10px; background: transparent; }
+        QScrollBar::handle:vertical { min-height:20px; background:#CFE0F4; border-radius:5px; }
+        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height:0; }
+        QScrollBar:horizontal { height: 10px; background: transparent; }
+        QScrollBar::handle:horizontal { min-width:20px; background:#CFE0F4; border-radius:5px; }
+        QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width:0; }
+"""
+
+# 节点右键菜单的预设颜色
+NODE_PALETTE = (
+    ("湖蓝", "#7EC8E3"),
+    ("薄荷绿", "#8EE3C2"),
+    ("向日黄", "#FFD166"),
+    ("珊瑚橙", "#FF9F80"),
+    ("薰衣草", "#C6B3FF"),
+    ("玫瑰粉", "#F7A8B8"),
+    ("苹果绿", "#9AD576"),
+    ("天空蓝", "#9AD0F5"),
+)
+
+# Markdown 列表项：缩进、项目符号、正文（导入时逐行匹配，预编译一次）
+_MD_ITEM_RE = re.compile(r"^(\s*)([-*+])\s+(.*\S)\s*$")
+
+
+def write_json_file(fn: str, obj) -> None:
+    """以 UTF-8、缩进 2 写出 JSON（非 ASCII 原样保留）；装有 orjson 时直接写字节。"""
+    if orjson is not None:
+        with open(fn, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(fn, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def write_json_file_atomic(fn: str, obj) -> None:
+    """写入同目录临时文件后 os.replace，读者只会看到完整的旧文件或新文件。"""
+    tmp = fn + ".tmp"
+    write_json_file(tmp, obj)
+    os.replace(tmp, fn)
+
+
+def read_json_file(fn: str):
+    if orjson is not None:
+        with open(fn, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(fn, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def graph_to_node_link(g: nx.Graph, nodes: Optional[list] = None) -> dict:
+    """与 nx.node_link_data(g, edges="links") 结构相同，直接拼字典，省去 networkx 的通用属性处理。
+
+    nodes 为调用方已按 g.nodes 顺序生成好的节点字典列表时直接采用，不再遍历一次。
+    """
+    return {
+        "directed": False,
+        "multigraph": False,
+        "graph": dict(g.graph),
+        "nodes": nodes if nodes is not None else [{**attrs, "id": n} for n, attrs in g.nodes.items()],
+        "links": [{**d, "source": u, "target": v} for u, v, d in g.edges(data=True)],
+    }
+
+
+def _json_id(x):
+    """JSON 里没有元组，元组 id 会被存成列表；与 nx.node_link_graph 一样逐层转回元组以便作键。"""
+    if isinstance(x, list):
+        return tuple(map(_json_id, x))
+    return x
+
+
+def node_link_to_graph(data: dict) -> nx.Graph:
+    """graph_to_node_link 的逆操作；有向图/多重图等非常规数据仍交给 nx.node_link_graph。"""
+    if data.get("directed") or data.get("multigraph"):
+        return nx.node_link_graph(data, edges="links")
+    g = nx.Graph()
+    g.graph.update(data.get("graph") or {})
+    for nd in data.get("nodes", ()):
+        attrs = dict(nd)
+        g.add_node(_json_id(attrs.pop("id", None)), **attrs)
+    for ln in data.get("links", ()):
+        attrs = dict(ln)
+        g.add_edge(_json_id(attrs.pop("source")), _json_id(attrs.pop("target")), **attrs)
+    return g
+
 
 # ---------------------------- 大纲视图参数配置 ----------------------------
 TITLE_ROLE = Qt.UserRole + 1
@@ -111,7 +307,9 @@ DEPTH_ROLE = Qt.UserRole + 2
 INDENT_SPACES = 4
 DEBOUNCE_MS_EDITOR_TO_TREE = 300
 
-BULLET_PREFIXES = ["- ", "* ", "+ "]
+BULLET_PREFIXES = ("- ", "* ", "+ ")  # 元组：可直接交给 str.startswith 一次判断
+_OUTLINE_NUMBER_RE = re.compile(r"^\d+[\.\)、]\s*")  # 大纲行首编号 1. / 2) / 3、
+_AUTO_NUMBER_RE = re.compile(r"^\d+(?:\.\d+)*\s+")  # 树上显示的自动编号 1.2.3
 LEVEL_COLORS_LIGHT = ["#ef4444", "#f59e0b", "#84cc16", "#06b6d4", "#8b5cf6", "#ec4899"]
 
 ACCENTS = {
@@ -119,23 +317,38 @@ ACCENTS = {
     "草原绿": "#40c057", "天空蓝": "#339af0", "薰衣草": "#cc5de8", "彩虹": "#ff6b6b"
 }
 
+# 设置项默认值（父窗口缺少对应属性或 Tab 尚未构建时使用）
+SETTINGS_DEFAULTS = {
+    'TARGET_EDGE': 180, 'MIN_CHORD_RATIO': 0.8, 'MAX_EXTRA_STRETCH': 3.0,
+    'EDGE_LENGTH_FACTOR': 1.0, 'SPATIAL_HASH_CELL_SIZE': 120, 'MIN_NODE_DISTANCE': 140,
+    'NODE_FONT_SIZE': 12, 'NODE_PADDING_X': 8, 'NODE_PADDING_Y': 6, 'NODE_CORNER_RADIUS': 12,
+    'EDGE_BASE_RADIUS': 160.0, 'EDGE_RING_SPACING': 160.0, 'EDGE_CONTROL_POINT_RATIO': 0.15, 'EDGE_BEND_RATIO': 0.05,
+    'RADIAL_BASE_R': 80.0, 'RADIAL_MAX_CONE': 120, 'RADIAL_PAD_ARC': 6.0, 'RADIAL_STRETCH_STEP': 40.0,
+    'SNAP_STEP': 40, 'ALIGN_THRESHOLD': 8,
+    'HISTORY_LIMIT': 100, 'AUTOSAVE_DELAY': 1500, 'USE_OPENGL': False,
+}
+
 
 # -------------------------- 性能监控装饰器 --------------------------
 def performance_monitor(func):
+    # 未开启调试日志时不做包装，避免每次调用多一层函数与计时开销
+    if not logger.isEnabledFor(logging.DEBUG):
+        return func
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            elapsed = time.time() - start_time
-            if elapsed > 0.1:  # 只记录耗时较长的操作
-                logger.debug(f"PERF: {func.__name__} took {elapsed:.3f}s")
-            return result
         except Exception as e:
-            elapsed = time.time() - start_time
+            elapsed = time.perf_counter() - start_time
             logger.error(f"PERF_ERROR: {func.__name__} failed after {elapsed:.3f}s: {e}")
             # 重新抛出原始异常，保持调用栈
             raise
+        elapsed = time.perf_counter() - start_time
+        if elapsed > 0.1:  # 只记录耗时较长的操作
+            logger.debug(f"PERF: {func.__name__} took {elapsed:.3f}s")
+        return result
     return wrapper
 
 def error_handler(message_prefix=""):
@@ -166,6 +379,27 @@ def clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
+def bezier_controls(x1: float, y1: float, x2: float, y2: float,
+                    ctrl_ratio: float, bend_ratio: float, bend_cap: float, sign: float = 1.0,
+                    near_dist: float = 0.0, near_ratio: float = 0.0) -> Tuple[float, float, float, float]:
+    """三次贝塞尔边的两个控制点 (c1x, c1y, c2x, c2y)。
+    沿连线方向伸出 d*ctrl_ratio，法向偏移 min(bend_cap, d*bend_ratio)；d < near_dist 时改用 d*near_ratio。
+    预览卡片与场景连线共用此函数。
+    """
+    dx = x2 - x1; dy = y2 - y1
+    d2 = dx*dx + dy*dy
+    if d2 > 1.0:
+        inv_d = 1.0 / math.sqrt(d2); d = d2 * inv_d
+    else:
+        inv_d = d = 1.0
+    # ux*t 化简为 dx*ctrl_ratio；法向 (-uy, ux) 乘以 b 化简为 (-dy, dx)*b*inv_d
+    b = d * near_ratio if d < near_dist else min(bend_cap, d * bend_ratio)
+    bs = b * sign * inv_d
+    tx, ty = dx * ctrl_ratio, dy * ctrl_ratio
+    bx, by = -dy * bs, dx * bs
+    return x1 + tx + bx, y1 + ty + by, x2 - tx + bx, y2 - ty + by
+
+
 class _PreviewCard(QWidget):
     """右侧实时预览：两节点 + 一条曲线边 + 背景网格，可缩放/暗色主题。
     setParameters(params: dict) 可随时更新。
@@ -175,6 +409,8 @@ class _PreviewCard(QWidget):
         # 增大预览区域尺寸
         self.setMinimumSize(400, 350)
         self.setObjectName("PreviewCard")
+        # paintEvent 会整体填充背景，无需 Qt 预先擦除
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         self._params: Dict[str, float] = {
             "NODE_FONT_SIZE": 12,
             "NODE_PADDING_X": 8,
@@ -190,9 +426,50 @@ class _PreviewCard(QWidget):
         # 添加更多预览元素
         self._show_grid = True
         self._show_edge_controls = True
+        # 贝塞尔连线缓存：仅当缩放或曲线参数变化时重建
+        self._path_cache = None
+        self._path_key = None
+        # 背景网格瓦片：(步长, 暗色) 变化时重绘，平铺绘制
+        self._grid_tile: Optional[QPixmap] = None
+        self._grid_key = None
+        # (字号, 文本) -> (宽, 高, 字体, 静态文本, 基线上移量)，避免每帧重建 QFontMetrics 与排版
+        self._node_rect_cache: Dict[Tuple[int, str], Tuple[int, int, QFont, QStaticText, int]] = {}
+        # 右下角缩放注记，按缩放值缓存
+        self._note_static: Optional[QStaticText] = None
+        self._note_zoom = None
+        self._rebuild_style()
+
+    def _rebuild_style(self):
+        """按明/暗主题预建颜色、画笔与画刷，paintEvent 中直接复用。"""
+        dark = self._dark
+        self._bg = QColor(22, 27, 34) if dark else QColor(248, 250, 253)
+        self._grid_color = QColor(62, 67, 74) if dark else QColor(226, 232, 240)
+        control_color = QColor(255, 200, 100, 180) if dark else QColor(255, 150, 50, 180)
+
+        self._edge_pen = QPen(QColor(198, 205, 213) if dark else QColor(140, 140, 140), 2)
+        self._edge_pen.setCosmetic(True)
+        self._control_line_pen = QPen(control_color, 1, Qt.DashLine)
+        self._control_line_pen.setCosmetic(True)
+        self._control_pen = QPen(control_color, 1)
+        self._control_brush = QBrush(control_color)
+
+        self._shadow_brush = QBrush(QColor(0, 0, 0, 120 if dark else 55))
+        self._border_pen = QPen(QColor(120, 170, 255) if dark else QColor(30, 70, 120), 2)
+        self._text_pen = QPen(QColor(240, 242, 244) if dark else QColor(20, 20, 20))
+        self._note_pen = QPen(QColor(155, 165, 175) if dark else QColor(120, 130, 140))
+        self._note_font = QFont("Segoe UI", 9)
+
+        base = QColor(173, 216, 230)
+        lighter = base.lighter(135)
+        darker = base.darker(125)
+        if dark:
+            lighter = lighter.darker(110); darker = darker.darker(130)
+        self._node_light = lighter
+        self._node_dark = darker
 
     def setDark(self, on: bool):
         self._dark = bool(on)
+        self._rebuild_style()
         self.update()
 
     def setZoom(self, z: float):
@@ -200,6 +477,8 @@ class _PreviewCard(QWidget):
         self.update()
 
     def setParameters(self, params: dict):
+        if "NODE_FONT_SIZE" in params and params["NODE_FONT_SIZE"] != self._params.get("NODE_FONT_SIZE"):
+            self._node_rect_cache.clear()
         self._params.update(params)
         self.update()
 
@@ -213,128 +492,144 @@ class _PreviewCard(QWidget):
 
     # --- 绘制 ---
     def _node_rect(self, text: str, center: Tuple[float, float]):
-        from PyQt5.QtGui import QFontMetrics
-        font = QFont("Segoe UI", int(self._params.get("NODE_FONT_SIZE", 12)), QFont.Medium)
-        fm = QFontMetrics(font)
-        w = fm.horizontalAdvance(text)
-        h = fm.height()
+        size = int(self._params.get("NODE_FONT_SIZE", 12))
+        key = (size, text)
+        cached = self._node_rect_cache.get(key)
+        if cached is None:
+            font = QFont("Segoe UI", size, QFont.Medium)
+            fm = QFontMetrics(font)
+            static = QStaticText(text)
+            static.setTextFormat(Qt.PlainText)
+            static.prepare(QTransform(), font)
+            cached = (fm.horizontalAdvance(text), fm.height(), font, static, fm.ascent())
+            self._node_rect_cache[key] = cached
+        w, h, font, static, ascent = cached
         px = int(self._params.get("NODE_PADDING_X", 8))
         py = int(self._params.get("NODE_PADDING_Y", 6))
         rect_w = w + 2 * px
         rect_h = h + 2 * py
         cx, cy = center
-        return QRectF(cx - rect_w/2, cy - rect_h/2, rect_w, rect_h), font
+        return QRectF(cx - rect_w/2, cy - rect_h/2, rect_w, rect_h), font, (static, w, h, ascent)
+
+    def _edge_geometry(self):
+        """返回 (path, p1, p2, c1, c2)；键未变时直接复用上次结果。"""
+        key = (
+            self._zoom,
+            float(self._params.get("EDGE_CONTROL_POINT_RATIO", 0.15)),
+            float(self._params.get("EDGE_BEND_RATIO", 0.05)),
+            float(self._params.get("EDGE_LENGTH_FACTOR", 1.0)),
+        )
+        if key == self._path_key and self._path_cache is not None:
+            return self._path_cache
+        zoom, control_point_ratio, bend_ratio, edge_length_factor = key
+        p1 = (int(100*zoom), int(100*zoom))
+        p2 = (int(300*zoom), int(250*zoom))
+
+        path = QPainterPath(QPointF(*p1))
+        # 使用参数控制曲线形状
+        c1x, c1y, c2x, c2y = bezier_controls(
+            p1[0], p1[1], p2[0], p2[1],
+            control_point_ratio * edge_length_factor, bend_ratio * edge_length_factor, 36.0)
+        c1 = QPointF(c1x, c1y)
+        c2 = QPointF(c2x, c2y)
+        path.cubicTo(c1, c2, QPointF(*p2))
 
-    def paintEvent(self, _):
+        self._path_key = key
+        self._path_cache = (path, p1, p2, c1, c2)
+        return self._path_cache
+
+    def _grid_pixmap(self, step: int, bg: QColor, grid: QColor) -> QPixmap:
+        """单个 step×step 网格瓦片（左/上边各一条线）。"""
+        key = (step, self._dark)
+        if key != self._grid_key or self._grid_tile is None:
+            tile = QPixmap(step, step)
+            tile.fill(bg)
+            tp = QPainter(tile)
+            tp.setPen(QPen(grid))
+            tp.drawLine(0, 0, step - 1, 0)
+            tp.drawLine(0, 0, 0, step - 1)
+            tp.end()
+            self._grid_tile = tile
+            self._grid_key = key
+        return self._grid_tile
+
+    def paintEvent(self, event):
+        # 被遮挡/隐藏（如对话框最小化）时无需绘制
+        if self.visibleRegion().isEmpty():
+            return
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing, True)
+        if event.rect() != self.rect():
+            p.setClipRect(event.rect())
 
         # 画背景
-        if self._dark:
-            bg = QColor(22, 27, 34)
-            grid = QColor(62, 67, 74)
-            control_color = QColor(255, 200, 100, 180)
-        else:
-            bg = QColor(248, 250, 253)
-            grid = QColor(226, 232, 240)
-            control_color = QColor(255, 150, 50, 180)
-        p.fillRect(self.rect(), bg)
+        p.fillRect(self.rect(), self._bg)
 
         # 网格（可选）
         if self._show_grid:
             step = clamp(float(self._params.get("SNAP_STEP", 40)), 10, 80)
-            pen_grid = QPen(grid)
-            pen_grid.setCosmetic(True)
-            p.setPen(pen_grid)
-            s = int(step)
-            for x in range(0, self.width(), s):
-                p.drawLine(x, 0, x, self.height())
-            for y in range(0, self.height(), s):
-                p.drawLine(0, y, self.width(), y)
-
-        # 两个示例节点位置（随缩放）
-        zoom = self._zoom
-        p1 = (int(100*zoom), int(100*zoom))
-        p2 = (int(300*zoom), int(250*zoom))
+            p.drawTiledPixmap(self.rect(), self._grid_pixmap(int(step), self._bg, self._grid_color))
 
-        # 贝塞尔连线
-        path = QPainterPath(QPointF(*p1))
-        dx = p2[0] - p1[0]; dy = p2[1] - p1[1]
-        d = max(1.0, (dx*dx + dy*dy) ** 0.5)
-        ux, uy = dx / d, dy / d
-        nx_, ny_ = -uy, ux
-        
-        # 使用参数控制曲线形状
-        edge_length_factor = float(self._params.get("EDGE_LENGTH_FACTOR", 1.0))
-        control_point_ratio = float(self._params.get("EDGE_CONTROL_POINT_RATIO", 0.15))
-        bend_ratio = float(self._params.get("EDGE_BEND_RATIO", 0.05))
-        
-        t = d * control_point_ratio * edge_length_factor
-        b = min(36.0, d * bend_ratio * edge_length_factor)
-        c1 = QPointF(p1[0] + ux * t + nx_ * b, p1[1] + uy * t + ny_ * b)
-        c2 = QPointF(p2[0] - ux * t + nx_ * b, p2[1] - uy * t + ny_ * b)
-        path.cubicTo(c1, c2, QPointF(*p2))
+        # 两个示例节点位置（随缩放）与贝塞尔连线
+        path, p1, p2, c1, c2 = self._edge_geometry()
 
-        pen_edge = QPen(QColor(140, 140, 140) if not self._dark else QColor(198, 205, 213), 2)
-        pen_edge.setCosmetic(True)
-        p.setPen(pen_edge)
+        p.setPen(self._edge_pen)
         p.setBrush(Qt.NoBrush)
         p.drawPath(path)
         
         # 显示控制点（可选）
         if self._show_edge_controls:
             # 控制点连线
-            pen_control_line = QPen(control_color, 1, Qt.DashLine)
-            pen_control_line.setCosmetic(True)
-            p.setPen(pen_control_line)
+            p.setPen(self._control_line_pen)
             p.drawLine(QPointF(*p1), c1)
             p.drawLine(c1, c2)
             p.drawLine(c2, QPointF(*p2))
             
             # 控制点
-            p.setBrush(QBrush(control_color))
-            p.setPen(QPen(control_color, 1))
+            p.setBrush(self._control_brush)
+            p.setPen(self._control_pen)
             control_radius = 4
             p.drawEllipse(c1, control_radius, control_radius)
             p.drawEllipse(c2, control_radius, control_radius)
 
         # 画两个圆角节点
-        r1, f1 = self._node_rect("父节点", p1)
-        r2, f2 = self._node_rect("子节点", p2)
+        r1, f1, l1 = self._node_rect("父节点", p1)
+        r2, f2, l2 = self._node_rect("子节点", p2)
         radius = int(self._params.get("NODE_CORNER_RADIUS", 12))
 
-        def draw_node(r: QRectF, font: QFont, base_color: QColor, text: str):
+        def draw_node(r: QRectF, font: QFont, label):
             # 阴影
             p.setPen(Qt.NoPen)
-            p.setBrush(QColor(0, 0, 0, 55 if not self._dark else 120))
+            p.setBrush(self._shadow_brush)
             p.drawRoundedRect(r.translated(2, 3), radius, radius)
             # 渐变
             grad = QLinearGradient(r.topLeft(), r.bottomRight())
-            lighter = QColor(base_color).lighter(135)
-            darker = QColor(base_color).darker(125)
-            if self._dark:
-                lighter = lighter.darker(110); darker = darker.darker(130)
-            grad.setColorAt(0.0, lighter)
-            grad.setColorAt(1.0, darker)
+            grad.setColorAt(0.0, self._node_light)
+            grad.setColorAt(1.0, self._node_dark)
             p.setBrush(grad)
-            p.setPen(QPen(QColor(30, 70, 120) if not self._dark else QColor(120, 170, 255), 2))
+            p.setPen(self._border_pen)
             p.drawRoundedRect(r, radius, radius)
-            # 文本
+            # 文本（静态文本按左上角定位，由基线位置减去 ascent 得到）
+            static, tw, th, ascent = label
             p.setFont(font)
-            p.setPen(QColor(20, 20, 20) if not self._dark else QColor(240, 242, 244))
-            fm = p.fontMetrics()
-            tw = fm.horizontalAdvance(text); th = fm.height()
-            p.drawText(QPointF(r.center().x() - tw/2, r.center().y() + th/4 - 2), text)
+            p.setPen(self._text_pen)
+            p.drawStaticText(QPointF(r.center().x() - tw/2, r.center().y() + th/4 - 2 - ascent), static)
 
-        base = QColor(173, 216, 230)
-        draw_node(r1, f1, base, "父节点")
-        draw_node(r2, f2, base, "子节点")
+        draw_node(r1, f1, l1)
+        draw_node(r2, f2, l2)
 
         # 右下角小注记
-        p.setPen(QPen(QColor(120, 130, 140) if not self._dark else QColor(155, 165, 175)))
-        p.setFont(QFont("Segoe UI", 9))
-        p.drawText(self.rect().adjusted(8, 8, -8, -8), Qt.AlignRight | Qt.AlignBottom,
-                   f"预览 ×{self._zoom:.2f}")
+        p.setPen(self._note_pen)
+        p.setFont(self._note_font)
+        if self._note_static is None or self._note_zoom != self._zoom:
+            self._note_static = QStaticText(f"预览 ×{self._zoom:.2f}")
+            self._note_static.setTextFormat(Qt.PlainText)
+            self._note_static.prepare(QTransform(), self._note_font)
+            self._note_zoom = self._zoom
+        note_size = self._note_static.size()
+        area = self.rect().adjusted(8, 8, -8, -8)
+        p.drawStaticText(QPointF(area.right() + 1 - note_size.width(), area.bottom() + 1 - note_size.height()),
+                         self._note_static)
                    
         # 显示当前参数值
         param_text = f"字体: {self._params.get('NODE_FONT_SIZE', 12)}px\n"
@@ -345,12 +640,70 @@ class _PreviewCard(QWidget):
 # -----------------------------------------------------------
 # SettingsDialog（升级版）
 # -----------------------------------------------------------
+class _ValueCheckBox(QCheckBox):
+    """开关型参数：提供与数值框相同的 value/setValue/valueChanged，可直接登记进 _PARAM_WIDGETS"""
+    valueChanged = pyqtSignal(bool)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.toggled.connect(self.valueChanged)
+
+    def value(self) -> bool:
+        return self.isChecked()
+
+    def setValue(self, v):
+        self.setChecked(bool(v))
+
+
 class SettingsDialog(QDialog):
     defaults_applied = pyqtSignal(dict)          # 运行期默认值（仅影响此后新增节点）
     apply_to_existing = pyqtSignal(dict)         # 可选：应用到现有节点（父窗口可连接）
 
+    # 参数键 -> 控件属性名（控件随所在 Tab 首次显示时才创建）
+    _PARAM_WIDGETS = {
+        'TARGET_EDGE': 'target_edge_spin',
+        'MIN_CHORD_RATIO': 'min_chord_ratio_spin',
+        'MAX_EXTRA_STRETCH': 'max_extra_stretch_spin',
+        'EDGE_LENGTH_FACTOR': 'edge_length_factor_spin',
+        'SPATIAL_HASH_CELL_SIZE': 'spatial_hash_cell_spin',
+        'MIN_NODE_DISTANCE': 'min_node_distance_spin',
+        'NODE_FONT_SIZE': 'node_font_size_spin',
+        'NODE_PADDING_X': 'node_padding_x_spin',
+        'NODE_PADDING_Y': 'node_padding_y_spin',
+        'NODE_CORNER_RADIUS': 'node_corner_radius_spin',
+        'EDGE_BASE_RADIUS': 'edge_base_radius_spin',
+        'EDGE_RING_SPACING': 'edge_ring_spacing_spin',
+        'EDGE_CONTROL_POINT_RATIO': 'edge_control_point_ratio_spin',
+        'EDGE_BEND_RATIO': 'edge_bend_ratio_spin',
+        'RADIAL_BASE_R': 'radial_base_r_spin',
+        'RADIAL_MAX_CONE': 'radial_max_cone_spin',
+        'RADIAL_PAD_ARC': 'radial_pad_arc_spin',
+        'RADIAL_STRETCH_STEP': 'radial_stretch_step_spin',
+        'SNAP_STEP': 'snap_step_spin',
+        'ALIGN_THRESHOLD': 'align_threshold_spin',
+        'HISTORY_LIMIT': 'history_limit_spin',
+        'AUTOSAVE_DELAY': 'autosave_delay_spin',
+        'USE_OPENGL': 'use_opengl_chk',
+    }
+    # 各 Tab（与 _tab_builders 顺序一致）包含的参数，供“恢复本页默认”使用
+    _TAB_KEYS = (
+        ('TARGET_EDGE', 'MIN_CHORD_RATIO', 'MAX_EXTRA_STRETCH', 'EDGE_LENGTH_FACTOR',
+         'SPATIAL_HASH_CELL_SIZE', 'MIN_NODE_DISTANCE'),
+        ('NODE_FONT_SIZE', 'NODE_PADDING_X', 'NODE_PADDING_Y', 'NODE_CORNER_RADIUS'),
+        ('EDGE_BASE_RADIUS', 'EDGE_RING_SPACING', 'EDGE_CONTROL_POINT_RATIO', 'EDGE_BEND_RATIO'),
+        ('RADIAL_BASE_R', 'RADIAL_MAX_CONE', 'RADIAL_PAD_ARC', 'RADIAL_STRETCH_STEP'),
+        ('SNAP_STEP', 'ALIGN_THRESHOLD'),
+        ('HISTORY_LIMIT', 'AUTOSAVE_DELAY', 'USE_OPENGL'),
+    )
+    # 实时预览关心的参数
+    _PREVIEW_KEYS = ("NODE_FONT_SIZE", "NODE_PADDING_X", "NODE_PADDING_Y", "NODE_CORNER_RADIUS",
+                     "EDGE_LENGTH_FACTOR", "SNAP_STEP", "EDGE_CONTROL_POINT_RATIO", "EDGE_BEND_RATIO")
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 父窗口当前参数快照（缺省取 SETTINGS_DEFAULTS），供各 Tab 初始化与未建控件读取
+        p = self.parent()
+        self._pd: Dict[str, float] = {k: getattr(p, k, d) for k, d in SETTINGS_DEFAULTS.items()}
         self.setWindowTitle("思维导图参数设置（增强预览版）")
         # 增大窗口尺寸以容纳更大的预览
         self.resize(1580, 850)
@@ -391,6 +744,12 @@ class SettingsDialog(QDialog):
         topbar.addWidget(btn_save)
         topbar.addWidget(btn_reset_all)
 
+        # 预览节流：窗口内的多次数值变化合并为一次重绘（最多约 20Hz）
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(50)
+        self._preview_timer.timeout.connect(self._do_preview_update)
+
         # 主体：左侧 Tab + 右侧预览
         self.tab_widget = QTabWidget(); self.tab_widget.setDocumentMode(True)
 
@@ -465,7 +824,11 @@ class SettingsDialog(QDialog):
         
         self.setLayout(outer_layout)
 
-        # 构建各 Tab
+        # 构建各 Tab（仅当前页立即构建，其余首次切换时再建）
+        self._pending_values: Dict[str, float] = {}
+        # get_values / 预览复用的结果字典，避免每次数值变化都重新分配
+        self._values: Dict[str, float] = dict.fromkeys(self._PARAM_WIDGETS)
+        self._preview_params: Dict[str, float] = dict.fromkeys(self._PREVIEW_KEYS)
         self._build_tabs()
 
         # 设置实时预览
@@ -475,28 +838,16 @@ class SettingsDialog(QDialog):
         self._apply_modern_style()
 
         # 首次渲染
-        self._on_any_value_changed()
+        self._do_preview_update()
 
     # ---------------- 实时预览连接 ----------------
     def _setup_real_time_preview(self):
-        """设置所有控件的实时预览连接"""
-        # 获取所有数值控件并连接信号
-        controls = [
-            self.target_edge_spin, self.min_chord_ratio_spin, self.max_extra_stretch_spin,
-            self.edge_length_factor_spin, self.spatial_hash_cell_spin, self.min_node_distance_spin,
-            self.node_font_size_spin, self.node_padding_x_spin, self.node_padding_y_spin,
-            self.node_corner_radius_spin, self.edge_base_radius_spin, self.edge_ring_spacing_spin,
-            self.edge_control_point_ratio_spin, self.edge_bend_ratio_spin, self.radial_base_r_spin,
-            self.radial_max_cone_spin, self.radial_pad_arc_spin, self.radial_stretch_step_spin,
-            self.snap_step_spin, self.align_threshold_spin, self.history_limit_spin,
-            self.autosave_delay_spin
-        ]
-        
-        for control in controls:
-            # 移除之前的连接（避免重复）
+        """设置所有已构建控件的实时预览连接"""
+        for control in self._built_controls():
+            # 仅移除之前的预览连接（避免重复），保留数值框与滑块的联动
             try:
-                control.valueChanged.disconnect()
-            except:
+                control.valueChanged.disconnect(self._on_any_value_changed)
+            except TypeError:
                 pass
             # 重新连接
             control.valueChanged.connect(self._on_any_value_changed)
@@ -504,23 +855,71 @@ class SettingsDialog(QDialog):
     # ---------------- UI 组装 ----------------
     def _build_tabs(self):
         self._groups = []  # 用于搜索过滤
+        self._search_index = None  # [(group, 小写标题, [小写标签...])]，全部 Tab 建好后生成
+        self._last_search = ""
+
+        self._tab_builders = [
+            ("📐 布局", self._make_tab_layout),
+            ("🔘 节点", self._make_tab_node),
+            ("🔗 边",   self._make_tab_edge),
+            ("🔄 排列", self._make_tab_arrangement),
+            ("👁️ 视图", self._make_tab_view),
+            ("⚡ 性能", self._make_tab_performance),
+        ]
+        self._tab_pages: List[QScrollArea] = []
+        self._built_tabs = set()
+        for label, _ in self._tab_builders:
+            page = self._scroll(None)
+            self._tab_pages.append(page)
+            self.tab_widget.addTab(page, label)
+
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+        self._ensure_tab_built(self.tab_widget.currentIndex())
+
+    def _ensure_tab_built(self, index: int):
+        """首次显示某个 Tab 时才创建其控件。"""
+        if index < 0 or index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        _, builder = self._tab_builders[index]
+        self._tab_pages[index].setWidget(builder())
+        # 未构建期间通过恢复默认/导入写入的值
+        for key, attr in self._PARAM_WIDGETS.items():
+            w = getattr(self, attr, None)
+            if w is not None and key in self._pending_values:
+                w.setValue(self._pending_values.pop(key))
+        self._setup_real_time_preview()
+        if self.search_edit.text().strip():
+            self._on_search(self.search_edit.text())
+
+    def _ensure_all_tabs_built(self):
+        for i in range(len(self._tab_builders)):
+            self._ensure_tab_built(i)
+
+    def _built_controls(self) -> List[QWidget]:
+        return [w for w in (getattr(self, attr, None) for attr in self._PARAM_WIDGETS.values()) if w is not None]
+
+    def _value(self, key: str):
+        """读取参数值：控件已建则取控件值，否则取待应用值/父窗口值/默认值。"""
+        w = getattr(self, self._PARAM_WIDGETS[key], None)
+        if w is not None:
+            return w.value()
+        if key in self._pending_values:
+            return self._pending_values[key]
+        return self._pd[key]
+
+    def _set_value(self, key: str, value):
+        w = getattr(self, self._PARAM_WIDGETS[key], None)
+        if w is not None:
+            w.setValue(value)
+        else:
+            self._pending_values[key] = value
 
-        self._tab_layout = self._make_tab_layout()
-        self._tab_node = self._make_tab_node()
-        self._tab_edge = self._make_tab_edge()
-        self._tab_arr = self._make_tab_arrangement()
-        self._tab_view = self._make_tab_view()
-        self._tab_perf = self._make_tab_performance()
-
-        self.tab_widget.addTab(self._scroll(self._tab_layout), "📐 布局")
-        self.tab_widget.addTab(self._scroll(self._tab_node),   "🔘 节点")
-        self.tab_widget.addTab(self._scroll(self._tab_edge),   "🔗 边")
-        self.tab_widget.addTab(self._scroll(self._tab_arr),    "🔄 排列")
-        self.tab_widget.addTab(self._scroll(self._tab_view),   "👁️ 视图")
-        self.tab_widget.addTab(self._scroll(self._tab_perf),   "⚡ 性能")
-
-    def _scroll(self, w: QWidget) -> QScrollArea:
-        s = QScrollArea(); s.setWidgetResizable(True); s.setWidget(w); return s
+    def _scroll(self, w: Optional[QWidget]) -> QScrollArea:
+        s = QScrollArea(); s.setWidgetResizable(True)
+        if w is not None:
+            s.setWidget(w)
+        return s
 
     # --- 一些工厂方法 ---
     def _group(self, title: str) -> QGroupBox:
@@ -540,11 +939,20 @@ class SettingsDialog(QDialog):
         sp.valueChanged.connect(self._on_any_value_changed)
         return sp
 
+    @staticmethod
+    def _sync_slider(sl: QSlider, v: int):
+        """数值框→滑块单向同步：屏蔽滑块信号，避免再回写数值框引发第二轮 valueChanged。"""
+        old = sl.blockSignals(True)
+        try:
+            sl.setValue(v)
+        finally:
+            sl.blockSignals(old)
+
     def _spin_with_slider(self, minv: int, maxv: int, defv: int, suffix: str | None = None) -> Tuple[QSpinBox, QSlider, QWidget]:
         sp = self._spin(minv, maxv, defv, suffix)
         sl = QSlider(Qt.Horizontal); sl.setRange(minv, maxv); sl.setValue(defv)
         sl.valueChanged.connect(sp.setValue)
-        sp.valueChanged.connect(sl.setValue)
+        sp.valueChanged.connect(lambda v: self._sync_slider(sl, v))
         box = QHBoxLayout(); box.addWidget(sp); box.addWidget(sl, 1)
         w = QWidget(); w.setLayout(box)
         return sp, sl, w
@@ -554,7 +962,7 @@ class SettingsDialog(QDialog):
         sp = self._dspin(minv, maxv, defv, step, decimals, suffix)
         sl = QSlider(Qt.Horizontal); sl.setRange(int(minv*scale), int(maxv*scale)); sl.setValue(int(defv*scale))
         sl.valueChanged.connect(lambda v: sp.setValue(v/scale))
-        sp.valueChanged.connect(lambda v: sl.setValue(int(v*scale)))
+        sp.valueChanged.connect(lambda v: self._sync_slider(sl, int(round(v*scale))))
         box = QHBoxLayout(); box.addWidget(sp); box.addWidget(sl, 1)
         w = QWidget(); w.setLayout(box)
         return sp, sl, w
@@ -565,12 +973,10 @@ class SettingsDialog(QDialog):
         g_basic = self._group("基本布局参数")
         f = QFormLayout(g_basic); f.setVerticalSpacing(12); f.setHorizontalSpacing(18)
 
-        # 从父窗口读取默认值（若无则给默认）
-        p = self.parent() or object()
-        self.target_edge_spin, _, w1 = self._spin_with_slider(120, 320, getattr(p, 'TARGET_EDGE', 180), "像素")
-        self.min_chord_ratio_spin, _, w2 = self._dspin_with_slider(0.5, 0.95, getattr(p, 'MIN_CHORD_RATIO', 0.8), 0.01, 2)
-        self.max_extra_stretch_spin, _, w3 = self._dspin_with_slider(1.0, 5.0, getattr(p, 'MAX_EXTRA_STRETCH', 3.0), 0.1, 1, "倍边长")
-        self.edge_length_factor_spin, _, w4 = self._dspin_with_slider(0.3, 3.0, getattr(p, 'EDGE_LENGTH_FACTOR', 1.0), 0.1, 1)
+        self.target_edge_spin, _, w1 = self._spin_with_slider(120, 320, self._pd['TARGET_EDGE'], "像素")
+        self.min_chord_ratio_spin, _, w2 = self._dspin_with_slider(0.5, 0.95, self._pd['MIN_CHORD_RATIO'], 0.01, 2)
+        self.max_extra_stretch_spin, _, w3 = self._dspin_with_slider(1.0, 5.0, self._pd['MAX_EXTRA_STRETCH'], 0.1, 1, "倍边长")
+        self.edge_length_factor_spin, _, w4 = self._dspin_with_slider(0.3, 3.0, self._pd['EDGE_LENGTH_FACTOR'], 0.1, 1)
         f.addRow("目标边长:", w1)
         f.addRow("弦长占比:", w2)
         f.addRow("最大附加拉伸:", w3)
@@ -578,8 +984,8 @@ class SettingsDialog(QDialog):
 
         g_adv = self._group("高级布局参数")
         f2 = QFormLayout(g_adv); f2.setVerticalSpacing(12); f2.setHorizontalSpacing(18)
-        self.spatial_hash_cell_spin, _, w5 = self._spin_with_slider(40, 240, getattr(p, 'SPATIAL_HASH_CELL_SIZE', 120), "像素")
-        self.min_node_distance_spin, _, w6 = self._spin_with_slider(80, 240, getattr(p, 'MIN_NODE_DISTANCE', 140), "像素")
+        self.spatial_hash_cell_spin, _, w5 = self._spin_with_slider(40, 240, self._pd['SPATIAL_HASH_CELL_SIZE'], "像素")
+        self.min_node_distance_spin, _, w6 = self._spin_with_slider(80, 240, self._pd['MIN_NODE_DISTANCE'], "像素")
         f2.addRow("空间哈希网格大小:", w5)
         f2.addRow("最小节点距离:", w6)
 
@@ -590,14 +996,14 @@ class SettingsDialog(QDialog):
         tab = QWidget(); lay = QVBoxLayout(tab); lay.setSpacing(16); lay.setContentsMargins(20, 20, 20, 20)
         g_text = self._group("文本参数")
         f = QFormLayout(g_text)
-        self.node_font_size_spin, _, w1 = self._spin_with_slider(8, 24, getattr(self.parent(), 'NODE_FONT_SIZE', 12), "像素")
+        self.node_font_size_spin, _, w1 = self._spin_with_slider(8, 24, self._pd['NODE_FONT_SIZE'], "像素")
         f.addRow("节点字体大小:", w1)
 
         g_size = self._group("尺寸参数")
         f2 = QFormLayout(g_size)
-        self.node_padding_x_spin, _, w2 = self._spin_with_slider(4, 28, getattr(self.parent(), 'NODE_PADDING_X', 8), "像素")
-        self.node_padding_y_spin, _, w3 = self._spin_with_slider(2, 24, getattr(self.parent(), 'NODE_PADDING_Y', 6), "像素")
-        self.node_corner_radius_spin, _, w4 = self._spin_with_slider(4, 28, getattr(self.parent(), 'NODE_CORNER_RADIUS', 12), "像素")
+        self.node_padding_x_spin, _, w2 = self._spin_with_slider(4, 28, self._pd['NODE_PADDING_X'], "像素")
+        self.node_padding_y_spin, _, w3 = self._spin_with_slider(2, 24, self._pd['NODE_PADDING_Y'], "像素")
+        self.node_corner_radius_spin, _, w4 = self._spin_with_slider(4, 28, self._pd['NODE_CORNER_RADIUS'], "像素")
         f2.addRow("水平内边距:", w2)
         f2.addRow("垂直内边距:", w3)
         f2.addRow("圆角半径:", w4)
@@ -609,15 +1015,15 @@ class SettingsDialog(QDialog):
         tab = QWidget(); lay = QVBoxLayout(tab); lay.setSpacing(16); lay.setContentsMargins(20, 20, 20, 20)
         g_geo = self._group("几何参数")
         f = QFormLayout(g_geo)
-        self.edge_base_radius_spin, _, w1 = self._dspin_with_slider(50.0, 240.0, getattr(self.parent(), 'EDGE_BASE_RADIUS', 160.0), 10.0, 1, "像素")
-        self.edge_ring_spacing_spin, _, w2 = self._dspin_with_slider(80.0, 280.0, getattr(self.parent(), 'EDGE_RING_SPACING', 160.0), 10.0, 1, "像素")
+        self.edge_base_radius_spin, _, w1 = self._dspin_with_slider(50.0, 240.0, self._pd['EDGE_BASE_RADIUS'], 10.0, 1, "像素")
+        self.edge_ring_spacing_spin, _, w2 = self._dspin_with_slider(80.0, 280.0, self._pd['EDGE_RING_SPACING'], 10.0, 1, "像素")
         f.addRow("基础半径:", w1)
         f.addRow("环间距:", w2)
 
         g_curve = self._group("曲线参数")
         f2 = QFormLayout(g_curve)
-        self.edge_control_point_ratio_spin, _, w3 = self._dspin_with_slider(0.05, 0.30, getattr(self.parent(), 'EDGE_CONTROL_POINT_RATIO', 0.15), 0.01, 2)
-        self.edge_bend_ratio_spin, _, w4 = self._dspin_with_slider(0.01, 0.10, getattr(self.parent(), 'EDGE_BEND_RATIO', 0.05), 0.01, 2)
+        self.edge_control_point_ratio_spin, _, w3 = self._dspin_with_slider(0.05, 0.30, self._pd['EDGE_CONTROL_POINT_RATIO'], 0.01, 2)
+        self.edge_bend_ratio_spin, _, w4 = self._dspin_with_slider(0.01, 0.10, self._pd['EDGE_BEND_RATIO'], 0.01, 2)
         f2.addRow("控制点比例:", w3)
         f2.addRow("弯曲比例:", w4)
 
@@ -628,10 +1034,10 @@ class SettingsDialog(QDialog):
         tab = QWidget(); lay = QVBoxLayout(tab); lay.setSpacing(16); lay.setContentsMargins(20, 20, 20, 20)
         g = self._group("径向排列参数")
         f = QFormLayout(g)
-        self.radial_base_r_spin, _, w1 = self._dspin_with_slider(40.0, 200.0, getattr(self.parent(), 'RADIAL_BASE_R', 80.0), 10.0, 1, "像素")
-        self.radial_max_cone_spin, _, w2 = self._spin_with_slider(60, 200, getattr(self.parent(), 'RADIAL_MAX_CONE', 120), "度")
-        self.radial_pad_arc_spin, _, w3 = self._dspin_with_slider(2.0, 24.0, getattr(self.parent(), 'RADIAL_PAD_ARC', 6.0), 1.0, 1, "度")
-        self.radial_stretch_step_spin, _, w4 = self._dspin_with_slider(10.0, 100.0, getattr(self.parent(), 'RADIAL_STRETCH_STEP', 40.0), 5.0, 1, "像素")
+        self.radial_base_r_spin, _, w1 = self._dspin_with_slider(40.0, 200.0, self._pd['RADIAL_BASE_R'], 10.0, 1, "像素")
+        self.radial_max_cone_spin, _, w2 = self._spin_with_slider(60, 200, self._pd['RADIAL_MAX_CONE'], "度")
+        self.radial_pad_arc_spin, _, w3 = self._dspin_with_slider(2.0, 24.0, self._pd['RADIAL_PAD_ARC'], 1.0, 1, "度")
+        self.radial_stretch_step_spin, _, w4 = self._dspin_with_slider(10.0, 100.0, self._pd['RADIAL_STRETCH_STEP'], 5.0, 1, "像素")
         f.addRow("基础半径:", w1)
         f.addRow("最大锥角:", w2)
         f.addRow("弧填充:", w3)
@@ -643,8 +1049,8 @@ class SettingsDialog(QDialog):
         tab = QWidget(); lay = QVBoxLayout(tab); lay.setSpacing(16); lay.setContentsMargins(20, 20, 20, 20)
         g = self._group("对齐参数")
         f = QFormLayout(g)
-        self.snap_step_spin, _, w1 = self._spin_with_slider(10, 80, getattr(self.parent(), 'SNAP_STEP', 40), "像素")
-        self.align_threshold_spin, _, w2 = self._spin_with_slider(4, 24, getattr(self.parent(), 'ALIGN_THRESHOLD', 8), "像素")
+        self.snap_step_spin, _, w1 = self._spin_with_slider(10, 80, self._pd['SNAP_STEP'], "像素")
+        self.align_threshold_spin, _, w2 = self._spin_with_slider(4, 24, self._pd['ALIGN_THRESHOLD'], "像素")
         f.addRow("对齐步长:", w1)
         f.addRow("对齐阈值:", w2)
         lay.addWidget(g); lay.addStretch(1)
@@ -654,161 +1060,90 @@ class SettingsDialog(QDialog):
         tab = QWidget(); lay = QVBoxLayout(tab); lay.setSpacing(16); lay.setContentsMargins(20, 20, 20, 20)
         g = self._group("性能参数")
         f = QFormLayout(g)
-        self.history_limit_spin, _, w1 = self._spin_with_slider(10, 500, getattr(self.parent(), 'HISTORY_LIMIT', 100))
-        self.autosave_delay_spin, _, w2 = self._spin_with_slider(100, 5000, getattr(self.parent(), 'AUTOSAVE_DELAY', 300), "毫秒")
+        self.history_limit_spin, _, w1 = self._spin_with_slider(10, 500, self._pd['HISTORY_LIMIT'])
+        self.autosave_delay_spin, _, w2 = self._spin_with_slider(100, 5000, self._pd['AUTOSAVE_DELAY'], "毫秒")
         f.addRow("历史记录限制:", w1)
         f.addRow("自动保存延迟:", w2)
+        self.use_opengl_chk = _ValueCheckBox("由 GPU 绘制画布（上下文不可用时自动退回）")
+        self.use_opengl_chk.setValue(self._pd['USE_OPENGL'])
+        self.use_opengl_chk.valueChanged.connect(self._on_any_value_changed)
+        f.addRow("OpenGL 渲染:", self.use_opengl_chk)
         lay.addWidget(g); lay.addStretch(1)
         return tab
 
     # ---------------- 值收集 ----------------
     def get_values(self) -> Dict[str, float]:
-        return {
-            # 布局
-            'TARGET_EDGE': self.target_edge_spin.value(),
-            'MIN_CHORD_RATIO': self.min_chord_ratio_spin.value(),
-            'MAX_EXTRA_STRETCH': self.max_extra_stretch_spin.value(),
-            'EDGE_LENGTH_FACTOR': self.edge_length_factor_spin.value(),
-            'SPATIAL_HASH_CELL_SIZE': self.spatial_hash_cell_spin.value(),
-            'MIN_NODE_DISTANCE': self.min_node_distance_spin.value(),
-            # 节点
-            'NODE_FONT_SIZE': self.node_font_size_spin.value(),
-            'NODE_PADDING_X': self.node_padding_x_spin.value(),
-            'NODE_PADDING_Y': self.node_padding_y_spin.value(),
-            'NODE_CORNER_RADIUS': self.node_corner_radius_spin.value(),
-            # 边
-            'EDGE_BASE_RADIUS': self.edge_base_radius_spin.value(),
-            'EDGE_RING_SPACING': self.edge_ring_spacing_spin.value(),
-            'EDGE_CONTROL_POINT_RATIO': self.edge_control_point_ratio_spin.value(),
-            'EDGE_BEND_RATIO': self.edge_bend_ratio_spin.value(),
-            # 排列
-            'RADIAL_BASE_R': self.radial_base_r_spin.value(),
-            'RADIAL_MAX_CONE': self.radial_max_cone_spin.value(),
-            'RADIAL_PAD_ARC': self.radial_pad_arc_spin.value(),
-            'RADIAL_STRETCH_STEP': self.radial_stretch_step_spin.value(),
-            # 视图
-            'SNAP_STEP': self.snap_step_spin.value(),
-            'ALIGN_THRESHOLD': self.align_threshold_spin.value(),
-            # 性能
-            'HISTORY_LIMIT': self.history_limit_spin.value(),
-            'AUTOSAVE_DELAY': self.autosave_delay_spin.value(),
-        }
+        """返回全部参数。结果字典会被复用，需要长期保存时请自行复制。"""
+        v = self._values
+        value = self._value
+        for key in self._PARAM_WIDGETS:
+            v[key] = value(key)
+        return v
 
     def get_creational_values(self) -> Dict[str, float]:
         return {
-            'NODE_FONT_SIZE': self.node_font_size_spin.value(),
-            'NODE_PADDING_X': self.node_padding_x_spin.value(),
-            'NODE_PADDING_Y': self.node_padding_y_spin.value(),
-            'NODE_CORNER_RADIUS': self.node_corner_radius_spin.value(),
+            'NODE_FONT_SIZE': self._value('NODE_FONT_SIZE'),
+            'NODE_PADDING_X': self._value('NODE_PADDING_X'),
+            'NODE_PADDING_Y': self._value('NODE_PADDING_Y'),
+            'NODE_CORNER_RADIUS': self._value('NODE_CORNER_RADIUS'),
         }
 
     # ---------------- 动作 ----------------
     def apply_current_values(self):
         self.defaults_applied.emit(self.get_creational_values())
         if self.apply_existing_chk.isChecked():
-            self.apply_to_existing.emit(self.get_values())
+            self.apply_to_existing.emit(dict(self.get_values()))
 
     def restore_current_tab_defaults(self):
         # 与原版保持相同默认
-        d = {
-            'TARGET_EDGE': 180, 'MIN_CHORD_RATIO': 0.8, 'MAX_EXTRA_STRETCH': 3.0,
-            'EDGE_LENGTH_FACTOR': 1.0, 'SPATIAL_HASH_CELL_SIZE': 120, 'MIN_NODE_DISTANCE': 140,
-            'NODE_FONT_SIZE': 12, 'NODE_PADDING_X': 8, 'NODE_PADDING_Y': 6, 'NODE_CORNER_RADIUS': 12,
-            'EDGE_BASE_RADIUS': 160.0, 'EDGE_RING_SPACING': 160.0, 'EDGE_CONTROL_POINT_RATIO': 0.15, 'EDGE_BEND_RATIO': 0.05,
-            'RADIAL_BASE_R': 80.0, 'RADIAL_MAX_CONE': 120, 'RADIAL_PAD_ARC': 6.0, 'RADIAL_STRETCH_STEP': 40.0,
-            'SNAP_STEP': 40, 'ALIGN_THRESHOLD': 8,
-            'HISTORY_LIMIT': 100, 'AUTOSAVE_DELAY': 300,
-        }
         i = self.tab_widget.currentIndex()
-        if i == 0:
-            self.target_edge_spin.setValue(d['TARGET_EDGE'])
-            self.min_chord_ratio_spin.setValue(d['MIN_CHORD_RATIO'])
-            self.max_extra_stretch_spin.setValue(d['MAX_EXTRA_STRETCH'])
-            self.edge_length_factor_spin.setValue(d['EDGE_LENGTH_FACTOR'])
-            self.spatial_hash_cell_spin.setValue(d['SPATIAL_HASH_CELL_SIZE'])
-            self.min_node_distance_spin.setValue(d['MIN_NODE_DISTANCE'])
-        elif i == 1:
-            self.node_font_size_spin.setValue(d['NODE_FONT_SIZE'])
-            self.node_padding_x_spin.setValue(d['NODE_PADDING_X'])
-            self.node_padding_y_spin.setValue(d['NODE_PADDING_Y'])
-            self.node_corner_radius_spin.setValue(d['NODE_CORNER_RADIUS'])
-        elif i == 2:
-            self.edge_base_radius_spin.setValue(d['EDGE_BASE_RADIUS'])
-            self.edge_ring_spacing_spin.setValue(d['EDGE_RING_SPACING'])
-            self.edge_control_point_ratio_spin.setValue(d['EDGE_CONTROL_POINT_RATIO'])
-            self.edge_bend_ratio_spin.setValue(d['EDGE_BEND_RATIO'])
-        elif i == 3:
-            self.radial_base_r_spin.setValue(d['RADIAL_BASE_R'])
-            self.radial_max_cone_spin.setValue(d['RADIAL_MAX_CONE'])
-            self.radial_pad_arc_spin.setValue(d['RADIAL_PAD_ARC'])
-            self.radial_stretch_step_spin.setValue(d['RADIAL_STRETCH_STEP'])
-        elif i == 4:
-            self.snap_step_spin.setValue(d['SNAP_STEP'])
-            self.align_threshold_spin.setValue(d['ALIGN_THRESHOLD'])
-        elif i == 5:
-            self.history_limit_spin.setValue(d['HISTORY_LIMIT'])
-            self.autosave_delay_spin.setValue(d['AUTOSAVE_DELAY'])
+        if 0 <= i < len(self._TAB_KEYS):
+            for key in self._TAB_KEYS[i]:
+                self._set_value(key, SETTINGS_DEFAULTS[key])
         self._on_any_value_changed()
 
     def restore_defaults(self):
-        # 全部恢复默认
-        spec = {
-            'TARGET_EDGE': (self.target_edge_spin, 180),
-            'MIN_CHORD_RATIO': (self.min_chord_ratio_spin, 0.8),
-            'MAX_EXTRA_STRETCH': (self.max_extra_stretch_spin, 3.0),
-            'EDGE_LENGTH_FACTOR': (self.edge_length_factor_spin, 1.0),
-            'SPATIAL_HASH_CELL_SIZE': (self.spatial_hash_cell_spin, 120),
-            'MIN_NODE_DISTANCE': (self.min_node_distance_spin, 140),
-            'NODE_FONT_SIZE': (self.node_font_size_spin, 12),
-            'NODE_PADDING_X': (self.node_padding_x_spin, 8),
-            'NODE_PADDING_Y': (self.node_padding_y_spin, 6),
-            'NODE_CORNER_RADIUS': (self.node_corner_radius_spin, 12),
-            'EDGE_BASE_RADIUS': (self.edge_base_radius_spin, 160.0),
-            'EDGE_RING_SPACING': (self.edge_ring_spacing_spin, 160.0),
-            'EDGE_CONTROL_POINT_RATIO': (self.edge_control_point_ratio_spin, 0.15),
-            'EDGE_BEND_RATIO': (self.edge_bend_ratio_spin, 0.05),
-            'RADIAL_BASE_R': (self.radial_base_r_spin, 80.0),
-            'RADIAL_MAX_CONE': (self.radial_max_cone_spin, 120),
-            'RADIAL_PAD_ARC': (self.radial_pad_arc_spin, 6.0),
-            'RADIAL_STRETCH_STEP': (self.radial_stretch_step_spin, 40.0),
-            'SNAP_STEP': (self.snap_step_spin, 40),
-            'ALIGN_THRESHOLD': (self.align_threshold_spin, 8),
-            'HISTORY_LIMIT': (self.history_limit_spin, 100),
-            'AUTOSAVE_DELAY': (self.autosave_delay_spin, 300),
-        }
-        for w, v in spec.values():
-            w.setValue(v)
+        # 全部恢复默认（未构建的 Tab 在首次显示时应用）
+        for key, v in SETTINGS_DEFAULTS.items():
+            self._set_value(key, v)
         self._on_any_value_changed()
 
     # ---------------- 搜索 & 导入导出 ----------------
+    def _build_search_index(self):
+        index = []
+        for g in self._groups:
+            lay = g.layout()
+            labels = []
+            # 收集 QFormLayout 的 labelItem 文本
+            for i in range(lay.rowCount()):
+                li = lay.itemAt(i, QFormLayout.LabelRole)
+                if li and li.widget():
+                    labels.append(li.widget().text().lower())
+            index.append((g, g.title().lower(), labels))
+        self._search_index = index
+
     def _on_search(self, text: str):
-        t = (text or "").strip()
+        t = (text or "").strip().lower()
+        if t == self._last_search:
+            return
+        self._last_search = t
         if not t:
             for g in self._groups:
                 g.setVisible(True)
             return
-        t = t.lower()
-        for g in self._groups:
-            title = g.title().lower()
-            # 若组标题匹配，整组显示；否则看表单里的标签
-            show = t in title
-            if not show:
-                lay = g.layout()
-                # 遍历 QFormLayout 的 labelItem
-                for i in range(lay.rowCount()):
-                    li = lay.itemAt(i, QFormLayout.LabelRole)
-                    if li and li.widget():
-                        if t in li.widget().text().lower():
-                            show = True; break
-            g.setVisible(show)
+        self._ensure_all_tabs_built()
+        if self._search_index is None:
+            self._build_search_index()
+        # 若组标题匹配，整组显示；否则看表单里的标签
+        for g, title, labels in self._search_index:
+            g.setVisible(t in title or any(t in label for label in labels))
 
     def _export_json(self):
         fn, _ = QFileDialog.getSaveFileName(self, "导出设置为 JSON", str(Path.home() / "mindmap_settings.json"), "JSON (*.json)")
         if not fn:
             return
         try:
-            with open(fn, 'w', encoding='utf-8') as f:
-                json.dump(self.get_values(), f, ensure_ascii=False, indent=2)
+            write_json_file(fn, self.get_values())
             QMessageBox.information(self, "成功", "设置已导出为 JSON。")
         except Exception as e:
             QMessageBox.critical(self, "失败", f"导出失败: {e}")
@@ -818,36 +1153,11 @@ class SettingsDialog(QDialog):
         if not fn:
             return
         try:
-            with open(fn, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            # 仅对存在键的控件赋值
-            m = {
-                'TARGET_EDGE': self.target_edge_spin,
-                'MIN_CHORD_RATIO': self.min_chord_ratio_spin,
-                'MAX_EXTRA_STRETCH': self.max_extra_stretch_spin,
-                'EDGE_LENGTH_FACTOR': self.edge_length_factor_spin,
-                'SPATIAL_HASH_CELL_SIZE': self.spatial_hash_cell_spin,
-                'MIN_NODE_DISTANCE': self.min_node_distance_spin,
-                'NODE_FONT_SIZE': self.node_font_size_spin,
-                'NODE_PADDING_X': self.node_padding_x_spin,
-                'NODE_PADDING_Y': self.node_padding_y_spin,
-                'NODE_CORNER_RADIUS': self.node_corner_radius_spin,
-                'EDGE_BASE_RADIUS': self.edge_base_radius_spin,
-                'EDGE_RING_SPACING': self.edge_ring_spacing_spin,
-                'EDGE_CONTROL_POINT_RATIO': self.edge_control_point_ratio_spin,
-                'EDGE_BEND_RATIO': self.edge_bend_ratio_spin,
-                'RADIAL_BASE_R': self.radial_base_r_spin,
-                'RADIAL_MAX_CONE': self.radial_max_cone_spin,
-                'RADIAL_PAD_ARC': self.radial_pad_arc_spin,
-                'RADIAL_STRETCH_STEP': self.radial_stretch_step_spin,
-                'SNAP_STEP': self.snap_step_spin,
-                'ALIGN_THRESHOLD': self.align_threshold_spin,
-                'HISTORY_LIMIT': self.history_limit_spin,
-                'AUTOSAVE_DELAY': self.autosave_delay_spin,
-            }
+            data = read_json_file(fn)
+            # 仅对存在键的参数赋值
             for k, v in (data or {}).items():
-                if k in m:
-                    m[k].setValue(v)
+                if k in self._PARAM_WIDGETS:
+                    self._set_value(k, v)
             self._on_any_value_changed()
             QMessageBox.information(self, "成功", "设置已从 JSON 导入。")
         except Exception as e:
@@ -855,19 +1165,20 @@ class SettingsDialog(QDialog):
 
     # ---------------- 即时预览 ----------------
     def _on_any_value_changed(self, *_):
+        if not self.live_preview_toggle.isChecked():
+            return
+        # 计时中不重启：按住方向键连续调节时仍按固定节奏刷新，而不是松手后才刷新
+        if not self._preview_timer.isActive():
+            self._preview_timer.start()
+
+    def _do_preview_update(self):
         if not self.live_preview_toggle.isChecked():
             return
         # 收集更多参数用于预览
-        params = {
-            "NODE_FONT_SIZE": self.node_font_size_spin.value(),
-            "NODE_PADDING_X": self.node_padding_x_spin.value(),
-            "NODE_PADDING_Y": self.node_padding_y_spin.value(),
-            "NODE_CORNER_RADIUS": self.node_corner_radius_spin.value(),
-            "EDGE_LENGTH_FACTOR": self.edge_length_factor_spin.value(),
-            "SNAP_STEP": self.snap_step_spin.value(),
-            "EDGE_CONTROL_POINT_RATIO": self.edge_control_point_ratio_spin.value(),
-            "EDGE_BEND_RATIO": self.edge_bend_ratio_spin.value(),
-        }
+        params = self._preview_params
+        value = self._value
+        for key in self._PREVIEW_KEYS:
+            params[key] = value(key)
         self.preview.setParameters(params)
 
     # ---------------- 样式 ----------------
@@ -894,8 +1205,16 @@ class SettingsDialog(QDialog):
 
 
 # -------------------------- 小工具函数 --------------------------
+_QCOLOR_HEX_CACHE: Dict[int, str] = {}
+
 def qcolor_to_hex(c: QColor) -> str:
-    return "#{:02X}{:02X}{:02X}".format(c.red(), c.green(), c.blue())
+    # 按 RGB 整数值缓存：取整数比 name() 构造字符串再转大写便宜得多，导图里的颜色种类也很少
+    key = c.rgb() & 0xFFFFFF
+    hx = _QCOLOR_HEX_CACHE.get(key)
+    if hx is None:
+        # name() 返回小写 "#rrggbb"，转大写与既有导出格式保持一致
+        hx = _QCOLOR_HEX_CACHE[key] = c.name(QColor.HexRgb).upper()
+    return hx
 
 def hex_to_qcolor(s: str) -> QColor:
     qc = QColor(s)
@@ -914,19 +1233,93 @@ def _angle_normalize(a: float) -> float:
 def _angle_between(p_center: QPointF, p: QPointF) -> float:
     return _angle_normalize(math.atan2(p.y() - p_center.y(), p.x() - p_center.x()))
 
+def _angles_between(cx: float, cy: float, coords: Iterable[Tuple[float, float]]) -> List[float]:
+    """批量版 _angle_between：输入为 (x, y) 坐标对，循环内不逐点调用函数也不跨 Qt 取坐标。"""
+    atan2 = math.atan2
+    twopi = 2.0 * math.pi
+    # Python 的 % 对正模数总返回非负值，与 _angle_normalize 结果一致
+    return [atan2(y - cy, x - cx) % twopi for x, y in coords]
+
+def _largest_gap(angles_sorted: List[float]) -> Tuple[float, float]:
+    """已排序角度（[0, 2π)）中最大间隙（含首尾回绕），返回 (间隙宽度, 起始角)。
+
+    相邻差由 map 在 C 层算出（islice 错位，不复制角度序列），末尾补上回绕间隙；
+    取最大、定位也交给内建函数，只分配一个间隙列表；并列时取靠前的间隙。
+    """
+    gaps = list(map(sub, islice(angles_sorted, 1, None), angles_sorted))
+    gaps.append(angles_sorted[0] + 2.0 * math.pi - angles_sorted[-1])
+    k = gaps.index(max(gaps))
+    return gaps[k], angles_sorted[k]
+
+def _largest_gap_mid(angles_sorted: List[float]) -> float:
+    """已排序角度中最大间隙的中点。"""
+    gap, a = _largest_gap(angles_sorted)
+    return _angle_normalize(a + gap / 2.0)
+
+# 候选角偏移表：0, +10°, -10°, +20°, -20°, ... 直到一整圈，模块加载时算好一次
+# 兄弟子节点偏好角的逐次增量：180°/φ，比 137.5° 黄金角在有限扇区内分布更均匀，新角不易追上刚放下的兄弟
+RADIAL_GOLDEN_INCREMENT = math.radians(111.24611797498108)
+
+_CANDIDATE_STEP = math.radians(10.0)
+_CANDIDATE_STEPS = tuple(k * _CANDIDATE_STEP for k in range(1, 37))
+_CANDIDATE_OFFSETS = (0.0,) + tuple(o for d in _CANDIDATE_STEPS for o in (d, -d))
+
+def _angle_candidates(center_angle: float, limit_deg: float) -> List[float]:
+    """扇区中心优先、再左右对称扩展的候选角（步长 10°，单侧不超过 limit_deg）。
+
+    偏移取自预先算好的表：二分确定条数后一次切片，整列表在推导式中生成。
+    """
+    limit = math.radians(max(10.0, limit_deg)) + 1e-9
+    count = 1 + 2 * bisect_right(_CANDIDATE_STEPS, limit)
+    twopi = 2.0 * math.pi
+    return [(center_angle + off) % twopi for off in _CANDIDATE_OFFSETS[:count]]
+
+def _slot_candidates(cx: float, cy: float, cand_trig, r0: float, ring: float, max_rings: int, seed: int):
+    """_find_free_slot 的候选坐标流：由内圈到外圈，逐个产出 (角度, 半径, x, y)。
+
+    纯数值部分与 Qt 无关，按需惰性产出，调用方找到空位即停止，后面的候选不再计算。
+    cand_trig 为各圈共用的 (角度, cos, sin)；首圈之外叠加 xorshift64 轻微抖动。
+    """
+    jitter_amp = min(8.0, ring * 0.02)
+    mask64 = 0xFFFFFFFFFFFFFFFF
+    for ring_i in range(max_rings + 1):
+        r = r0 + ring_i * ring
+        if not ring_i:
+            for ang, cos_a, sin_a in cand_trig:
+                yield ang, r, cx + r * cos_a, cy + r * sin_a
+            continue
+        # xorshift64 状态按 (锚点, 圈号) 播种；非零保证序列不退化
+        rs = ((seed ^ (ring_i * 2654435761)) & mask64) or 1
+        for ang, cos_a, sin_a in cand_trig:
+            # x、y 各滚一次 xorshift
+            rs ^= (rs << 13) & mask64; rs ^= rs >> 7; rs ^= (rs << 17) & mask64
+            jx = jitter_amp * (0.5 - (rs & 1023) / 1023.0)
+            rs ^= (rs << 13) & mask64; rs ^= rs >> 7; rs ^= (rs << 17) & mask64
+            jy = jitter_amp * (0.5 - (rs & 1023) / 1023.0)
+            yield ang, r, cx + r * cos_a + jx, cy + r * sin_a + jy
+
 def vsep() -> QWidget:
     line = QFrame(); line.setFrameShape(QFrame.VLine); line.setFrameShadow(QFrame.Sunken); line.setStyleSheet("color:#cbd5e0")
     return line
 
 # ---------------------------- 视图 ----------------------------
 class MindMapView(QGraphicsView):
-    def __init__(self, scene, parent=None):
+    # 拖动节点的连线数超过此值时脏区并集基本覆盖整个视口，直接整屏刷新更省
+    DENSE_EDGE_THRESHOLD = 24
+    def __init__(self, scene, parent=None, use_opengl: bool = False):
         super().__init__(scene, parent)
         self.setRenderHint(QPainter.Antialiasing)
         self.setDragMode(QGraphicsView.RubberBandDrag)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
-        self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
+        # OpenGL 视口（由 GPU 光栅化）由设置 USE_OPENGL 控制，默认关闭；显示后上下文无效时自动退回普通视口
+        self._opengl = bool(use_opengl) and self._enable_opengl()
+        # 视口中心的场景坐标缓存；滚动、缩放、尺寸或场景范围变化时作废
+        self._center_cache = None
+        scene.sceneRectChanged.connect(self._invalidate_center)
 
         # 平移状态
         self._panning = False
@@ -953,6 +1346,93 @@ class MindMapView(QGraphicsView):
         if 0.1 <= new.m11() <= 4.0:
             self.setTransform(new)
 
+    def _invalidate_center(self, *_):
+        self._center_cache = None
+
+    def viewport_center_scene(self) -> QPointF:
+        """视口中心对应的场景坐标（缓存，返回副本）"""
+        if self._center_cache is None:
+            self._center_cache = self.mapToScene(self.viewport().rect().center())
+        return QPointF(self._center_cache)
+
+    def setTransform(self, matrix, combine=False):
+        self._center_cache = None
+        super().setTransform(matrix, combine)
+
+    def scrollContentsBy(self, dx, dy):
+        self._center_cache = None
+        super().scrollContentsBy(dx, dy)
+
+    def resizeEvent(self, event):
+        self._center_cache = None
+        super().resizeEvent(event)
+
+    def _enable_opengl(self) -> bool:
+        try:
+            from PyQt5.QtWidgets import QOpenGLWidget
+            from PyQt5.QtGui import QSurfaceFormat
+        except ImportError:
+            return False
+        try:
+            gl = QOpenGLWidget()
+            fmt = QSurfaceFormat()
+            fmt.setSamples(2)  # 多重采样抗锯齿
+            gl.setFormat(fmt)
+            self.setViewport(gl)
+        except Exception as e:
+            logger.warning(f"OpenGL 视口不可用，使用默认视口: {e}")
+            return False
+        # GL 视口每帧整体重绘，局部脏区计算没有意义
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        return True
+
+    def _disable_opengl(self):
+        self._opengl = False
+        self.setViewport(QWidget())
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+
+    def set_opengl(self, enabled: bool):
+        """运行中切换视口（设置对话框保存后调用）"""
+        if enabled == self._opengl:
+            return
+        if not enabled:
+            self._disable_opengl()
+            return
+        self._opengl = self._enable_opengl()
+        if self._opengl and self.isVisible():
+            QTimer.singleShot(0, self._check_opengl_context)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._opengl:
+            # 上下文在视口首次显示时才创建，等事件循环跑一轮再检查
+            QTimer.singleShot(0, self._check_opengl_context)
+
+    def _check_opengl_context(self):
+        if not self._opengl:
+            return
+        gl = self.viewport()
+        ctx = gl.context() if hasattr(gl, 'context') else None
+        if ctx is not None and ctx.isValid():
+            return
+        logger.warning("OpenGL 上下文无效，退回默认视口")
+        self._disable_opengl()
+
+    def set_dense_update(self, dense: bool):
+        if self._opengl:
+            return
+        mode = QGraphicsView.FullViewportUpdate if dense else QGraphicsView.SmartViewportUpdate
+        if self.viewportUpdateMode() != mode:
+            self.setViewportUpdateMode(mode)
+
+    def _choose_update_mode_for(self, item):
+        """按将被拖动节点的连线数选择刷新策略。"""
+        while item is not None and not isinstance(item, MindMapNode):
+            item = item.parentItem()  # 点在节点文字上时取其所属节点
+        edges_by_node = getattr(self.scene(), 'edges_by_node', None)
+        moved_edges = len(edges_by_node.get(item, ())) if item is not None and edges_by_node is not None else 0
+        self.set_dense_update(moved_edges > self.DENSE_EDGE_THRESHOLD)
+
     def _begin_pan(self, pos):
         self._panning = True
         self._last_pan_point = pos
@@ -961,8 +1441,14 @@ class MindMapView(QGraphicsView):
     def _do_pan(self, pos):
         delta = pos - self._last_pan_point
         self._last_pan_point = pos
-        self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
-        self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+        # 只动有位移的那一轴，纯水平/竖直拖动时只触发一次滚动与重绘
+        dx, dy = delta.x(), delta.y()
+        if dx:
+            hbar = self.horizontalScrollBar()
+            hbar.setValue(hbar.value() - dx)
+        if dy:
+            vbar = self.verticalScrollBar()
+            vbar.setValue(vbar.value() - dy)
 
     def _end_pan(self):
         self._panning = False
@@ -977,6 +1463,9 @@ class MindMapView(QGraphicsView):
             event.accept()
             return
 
+        if event.button() == Qt.LeftButton:
+            self._choose_update_mode_for(self.itemAt(event.pos()))
+
         if event.button() == Qt.RightButton:
             self._right_is_down = True
             self._right_down_pos = event.pos()
@@ -1060,87 +1549,80 @@ class MindMapEdge(QGraphicsPathItem):
         self._pen.setCosmetic(True)
         self.setPen(self._pen)
         self.setZValue(-1)
+        # 弯曲方向中只依赖拓扑的部分（父子朝向、层级奇偶）按层级缓存代数缓存
+        self._level_epoch = None
+        self._parent_first = True
+        self._odd_level = False
+        self._fixed_sign = None  # 层级不可用时的哈希方向
+        self._path_key = None  # 上次建路径时的 (端点, 长度系数, 方向)
         self.update_path()
 
     def update_path(self):
         n1, n2 = self.node_pair
-        p1 = center_in_scene(n1)
-        p2 = center_in_scene(n2)
-        path = QPainterPath(p1)
-
-        dx = p2.x() - p1.x()
-        dy = p2.y() - p1.y()
-        d = math.hypot(dx, dy) or 1.0
-        ux, uy = dx / d, dy / d
-        nx_, ny_ = -uy, ux
-
-        # 安全地获取参数
-        edge_length_factor = 1.0
         scene = self.scene()
-        if scene and hasattr(scene, 'parent') and scene.parent:
-            parent_app = scene.parent
-            edge_length_factor = getattr(parent_app, 'EDGE_LENGTH_FACTOR', 1.0)
-            
-            # 计算节点层级
-            try:
-                level1 = parent_app._get_node_level(n1.name)
-                level2 = parent_app._get_node_level(n2.name)
-                
-                # 确定父子关系（层级较低的为父节点）
-                parent_node = n1 if level1 < level2 else n2
-                child_node = n2 if level1 < level2 else n1
-                
-                # 基于父节点和子节点的相对位置决定弯曲方向
-                parent_pos = parent_node.pos()
-                child_pos = child_node.pos()
-                
-                # 计算相对于父节点的角度
-                rel_angle = math.atan2(child_pos.y() - parent_pos.y(), 
-                                    child_pos.x() - parent_pos.x())
-                
-                # 将角度映射到 [0, 2π) 范围
-                if rel_angle < 0:
-                    rel_angle += 2 * math.pi
-                    
-                # 根据层级和角度决定弯曲方向
-                base_level = min(level1, level2)
-                sector = int(rel_angle / (math.pi / 4)) % 8
-                
-                # 奇数层级：右半圆向上弯曲，左半圆向下弯曲
-                # 偶数层级：右半圆向下弯曲，左半圆向上弯曲
-                if base_level % 2 == 1:  # 奇数层级
-                    if sector < 4:  # 右半圆
-                        sign = 1  # 向上
-                    else:  # 左半圆
-                        sign = -1  # 向下
-                else:  # 偶数层级
-                    if sector < 4:  # 右半圆
-                        sign = -1  # 向下
-                    else:  # 左半圆
-                        sign = 1  # 向上
-            except (AttributeError, KeyError, TypeError) as e:
-                # 只捕获预期的异常，其他异常继续抛出
-                logger.debug(f"边弯曲方向计算失败，使用备用方案: {e}")
-                # 备用方案：基于节点名称哈希
-                sign = 1 if (hash(n1.name) + hash(n2.name)) % 2 == 0 else -1
-            except Exception as e:
-                # 其他异常记录并重新抛出
-                logger.error(f"边弯曲方向计算出现意外错误: {e}")
-                raise
-        else:
-            # 备用方案：基于节点名称哈希
-            sign = 1 if (hash(n1.name) + hash(n2.name)) % 2 == 0 else -1
-
-        # 使用动态连线长度系数
-        t = d * 0.15 * edge_length_factor
-        b = min(30.0, d * 0.05 * edge_length_factor)
+        parent_app = scene.parent if scene and hasattr(scene, 'parent') else None
+        edge_length_factor = getattr(parent_app, 'EDGE_LENGTH_FACTOR', 1.0) if parent_app else 1.0
+        self._apply_path(n1.scene_center(), n2.scene_center(), edge_length_factor, self._bend_sign(parent_app))
 
-        # 对于非常近的节点，减小弯曲幅度
-        if d < 100:
-            b = d * 0.03 * edge_length_factor
-
-        c1 = QPointF(p1.x() + ux * t + nx_ * b * sign, p1.y() + uy * t + ny_ * b * sign)
-        c2 = QPointF(p2.x() - ux * t + nx_ * b * sign, p2.y() - uy * t + ny_ * b * sign)
+    def _bend_sign(self, parent_app) -> int:
+        """弯曲方向 ±1：由父子层级与子节点所在半圆决定；无法判定时按名称哈希。"""
+        n1, n2 = self.node_pair
+        epoch = getattr(parent_app, '_level_epoch', None) if parent_app else None
+        if epoch is None:
+            # 备用方案：基于节点名称哈希
+            return 1 if (hash(n1.name) + hash(n2.name)) % 2 == 0 else -1
+        if epoch != self._level_epoch:
+            self._refresh_level_info(parent_app)
+            # 查询层级可能触发重建并推进代数，取查询后的值
+            self._level_epoch = parent_app._level_epoch
+        if self._fixed_sign is not None:
+            return self._fixed_sign
+
+        # 基于父节点和子节点的相对位置决定弯曲方向
+        parent_node, child_node = (n1, n2) if self._parent_first else (n2, n1)
+        parent_pos = parent_node.pos()
+        child_pos = child_node.pos()
+        dx = child_pos.x() - parent_pos.x()
+        dy = child_pos.y() - parent_pos.y()
+        # 相对角落在 [0, π) 即右半圆（等价于原 atan2 分扇区判断）
+        right = dy > 0 or (dy == 0 and dx >= 0)
+
+        # 奇数层级：右半圆向上弯曲，左半圆向下弯曲
+        # 偶数层级：右半圆向下弯曲，左半圆向上弯曲
+        if self._odd_level:
+            return 1 if right else -1
+        return -1 if right else 1
+
+    def _refresh_level_info(self, parent_app):
+        """重新查询两端层级，缓存父子朝向与层级奇偶；层级不可用时退回名称哈希。"""
+        n1, n2 = self.node_pair
+        get_level = getattr(parent_app, '_get_node_level', None)
+        level1 = get_level(n1.name) if get_level is not None else None
+        level2 = get_level(n2.name) if level1 is not None else None
+        if level2 is None:
+            logger.debug("边弯曲方向无法由层级确定，使用备用方案")
+            # 备用方案：基于节点名称哈希
+            self._fixed_sign = 1 if (hash(n1.name) + hash(n2.name)) % 2 == 0 else -1
+            return
+        # 确定父子关系（层级较低的为父节点）
+        self._parent_first = level1 < level2
+        self._odd_level = min(level1, level2) % 2 == 1
+        self._fixed_sign = None
+
+    def _apply_path(self, p1: QPointF, p2: QPointF, edge_length_factor: float, sign: int):
+        key = (p1.x(), p1.y(), p2.x(), p2.y(), edge_length_factor, sign)
+        if key == self._path_key:
+            # 端点与参数都没变（如另一端刚被更新过），无需重建路径
+            return
+        self._path_key = key
+        path = QPainterPath(p1)
+        # 使用动态连线长度系数；对于非常近的节点（<100px），减小弯曲幅度
+        c1x, c1y, c2x, c2y = bezier_controls(
+            p1.x(), p1.y(), p2.x(), p2.y(),
+            0.15 * edge_length_factor, 0.05 * edge_length_factor, 30.0, sign,
+            near_dist=100.0, near_ratio=0.03 * edge_length_factor)
+        c1 = QPointF(c1x, c1y)
+        c2 = QPointF(c2x, c2y)
 
         path.cubicTo(c1, c2, p2)
         self.setPath(path)
@@ -1155,10 +1637,16 @@ class MindMapNode(QGraphicsObject):
     color_changed = pyqtSignal(object)
     renamed = pyqtSignal(object, str, str)
 
+    _SHADOW_BRUSH = QBrush(QColor(0, 0, 0, 35))
+    _ctx_menu = None
+    # 任一节点尺寸变化时递增，供平均尺寸等跨节点缓存判断失效
+    geometry_epoch = 0
+
     def __init__(self, name, color: QColor = QColor(173, 216, 230), *, font_size:int=12, pad_x:int=8, pad_y:int=6, corner_radius:int=12):
         QGraphicsObject.__init__(self)
-        self.name = name
+        self.name = sys.intern(name)  # 驻留后各处按名称查表时可直接走身份比较
         self.color = color
+        self._scene_center_cache = None
         self._font_size = int(font_size)
         self._pad_x = int(pad_x)
         self._pad_y = int(pad_y)
@@ -1197,10 +1685,32 @@ class MindMapNode(QGraphicsObject):
         pad_x, pad_y = self._pad_x, self._pad_y
         self.rect = QRectF(-tr.width() / 2 - pad_x, -tr.height() / 2 - pad_y,
                            tr.width() + 2 * pad_x, tr.height() + 2 * pad_y)
+        self._shadow_rect = self.rect.translated(2, 3)
+        self._scene_center_cache = None
+        # 供布局/碰撞检测估算的“半径”：boundingRect 对角线一半加 10px 余量
+        br = self.boundingRect()
+        self.radius_px = math.hypot(br.width(), br.height()) * 0.5 + 10.0
+        MindMapNode.geometry_epoch += 1
+        self._rebuild_brush()
+
+    def _rebuild_brush(self):
+        """颜色或尺寸变化时重建渐变画刷，paint 中直接复用。"""
+        grad = QLinearGradient(self.rect.topLeft(), self.rect.bottomRight())
+        # lighter()/darker() 本身返回新颜色，无需先复制
+        grad.setColorAt(0.0, self.color.lighter(135))
+        grad.setColorAt(1.0, self.color.darker(115))
+        self._brush = QBrush(grad)
 
     def boundingRect(self):
         return self.rect.adjusted(-6, -6, 6, 6)
 
+    def scene_center(self) -> QPointF:
+        """center_in_scene 的缓存版本；位置或尺寸变化时失效。"""
+        c = self._scene_center_cache
+        if c is None:
+            c = self._scene_center_cache = center_in_scene(self)
+        return c
+
     def shape(self):
         path = QPainterPath()
         r = self.rect.adjusted(-2, -2, 2, 2)
@@ -1208,29 +1718,23 @@ class MindMapNode(QGraphicsObject):
         return path
 
     def paint(self, painter, option, widget):
-        shadow_rect = self.rect.translated(2, 3)
         painter.setPen(Qt.NoPen)
-        painter.setBrush(QColor(0, 0, 0, 35))
-        painter.drawRoundedRect(shadow_rect, self._corner_radius, self._corner_radius)
-
-        grad = QLinearGradient(self.rect.topLeft(), self.rect.bottomRight())
-        base = QColor(self.color)
-        lighter = QColor(base).lighter(135)
-        darker = QColor(base).darker(115)
-        grad.setColorAt(0.0, lighter)
-        grad.setColorAt(1.0, darker)
+        painter.setBrush(self._SHADOW_BRUSH)
+        painter.drawRoundedRect(self._shadow_rect, self._corner_radius, self._corner_radius)
 
-        painter.setBrush(QBrush(grad))
+        painter.setBrush(self._brush)
         painter.setPen(self.highlight_pen if (self._hover or self.isSelected()) else self.base_pen)
         painter.drawRoundedRect(self.rect, self._corner_radius, self._corner_radius)
 
     def set_color(self, color: QColor):
         self.color = QColor(color)
+        self._rebuild_brush()
         self.update()
         self.color_changed.emit(self)
 
     def set_name(self, new_name: str):
         old_name = self.name
+        new_name = sys.intern(new_name)
         self.name = new_name
         self.text_item.setPlainText(new_name)
         self._recenter_text()
@@ -1242,13 +1746,23 @@ class MindMapNode(QGraphicsObject):
         if event.button() == Qt.LeftButton:
             scene = self.scene()
             if scene and hasattr(scene, 'parent'):
-                # 清除其他节点的选择状态，实现单选
-                for item in scene.items():
-                    if isinstance(item, MindMapNode) and item != self:
-                        item.setSelected(False)
+                # select_node 会一次性清掉其他选择，实现单选
                 scene.parent.select_node(self)
+            # 拖动期间不走设备坐标缓存，省去每帧重建离屏位图；松开后恢复
+            self.setCacheMode(QGraphicsItem.NoCache)
         super().mousePressEvent(event)
 
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        super().mouseReleaseEvent(event)
+
+    def ungrabMouseEvent(self, event):
+        # 拖动中途失去抓取（焦点切走、弹出模态框、节点被删）时收不到松开事件，在这里兜底恢复缓存
+        if self.cacheMode() != QGraphicsItem.DeviceCoordinateCache:
+            self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        super().ungrabMouseEvent(event)
+
     def itemChange(self, change, value):
         parent = None
         scene = self.scene()
@@ -1261,34 +1775,32 @@ class MindMapNode(QGraphicsObject):
                 snapped = QPointF(round(p.x() / step) * step, round(p.y() / step) * step)
                 return snapped
         if change == QGraphicsItem.ItemPositionHasChanged:
+            self._scene_center_cache = None
             self.moved.emit(self)
             if scene and parent is not None and parent.graph is not None and parent.graph.has_node(self.name):
                 parent.graph.nodes[self.name]['pos'] = (self.x(), self.y())
         return super().itemChange(change, value)
 
+    @classmethod
+    def _context_menu(cls):
+        """右键菜单只构建一次，所有节点共用（菜单为模态弹出，不会并发使用）。"""
+        if cls._ctx_menu is None:
+            menu = QMenu()
+            act_rename = menu.addAction("重命名节点")
+            sub = menu.addMenu("更改颜色")
+            color_actions = []
+            for name, hex_color in NODE_PALETTE:
+                act = sub.addAction(name)
+                act.setData(QColor(hex_color))
+                color_actions.append(act)
+            sub.addSeparator()
+            act_custom = sub.addAction("自定义")
+            act_delete = menu.addAction("删除节点 (Ctrl+D)")
+            cls._ctx_menu = (menu, act_rename, tuple(color_actions), act_custom, act_delete)
+        return cls._ctx_menu
+
     def contextMenuEvent(self, event):
-        menu = QMenu()
-        act_rename = menu.addAction("重命名节点")
-
-        sub = menu.addMenu("更改颜色")
-        palette = [
-            ("湖蓝", QColor("#7EC8E3")),
-            ("薄荷绿", QColor("#8EE3C2")),
-            ("向日黄", QColor("#FFD166")),
-            ("珊瑚橙", QColor("#FF9F80")),
-            ("薰衣草", QColor("#C6B3FF")),
-            ("玫瑰粉", QColor("#F7A8B8")),
-            ("苹果绿", QColor("#9AD576")),
-            ("天空蓝", QColor("#9AD0F5")),
-        ]
-        color_actions = []
-        for name, c in palette:
-            act = sub.addAction(name)
-            act.setData(c)
-            color_actions.append(act)
-        sub.addSeparator()
-        act_custom = sub.addAction("自定义")
-        act_delete = menu.addAction("删除节点 (Ctrl+D)")
+        menu, act_rename, color_actions, act_custom, act_delete = self._context_menu()
         chosen = menu.exec_(event.screenPos())
 
         if chosen == act_rename:
@@ -1334,6 +1846,8 @@ class MindMapScene(QGraphicsScene):
         super().__init__(parent)
         self.parent = parent
         self.edges_by_node = defaultdict(set)
+        self._grid_key = None
+        self._grid_brush_cache = None
         self._guide_h = None
         self._guide_v = None
         self.selectionChanged.connect(self._on_selection_changed)
@@ -1360,22 +1874,51 @@ class MindMapScene(QGraphicsScene):
         self.edges_by_node[n2].discard(edge_item)
 
     def update_connections_for(self, moved_node: MindMapNode):
-        for edge in list(self.edges_by_node[moved_node]):
-            edge.update_path()
+        self._recompute_edges_bulk(list(self.edges_by_node[moved_node]))
+
+    def _recompute_edges_bulk(self, edges):
+        """批量重算连线路径：参数只取一次，端点中心取节点缓存值。"""
+        if not edges:
+            return
+        if len(edges) == 1:
+            edges[0].update_path()
+            return
+        parent_app = self.parent or None
+        edge_length_factor = getattr(parent_app, 'EDGE_LENGTH_FACTOR', 1.0) if parent_app else 1.0
+        for edge in edges:
+            n1, n2 = edge.node_pair
+            edge._apply_path(n1.scene_center(), n2.scene_center(), edge_length_factor, edge._bend_sign(parent_app))
+
+    def _grid_brush(self, step: int, scale: float) -> QBrush:
+        """按当前缩放生成的网格瓦片画刷：瓦片按设备像素绘制，线宽保持 1px。"""
+        key = (step, round(scale, 4))
+        if key != self._grid_key:
+            px = max(1, int(round(step * scale)))
+            tile = QPixmap(px, px)
+            tile.fill(QColor(248, 250, 253))
+            tp = QPainter(tile)
+            tp.setPen(QPen(QColor(225, 232, 245), 0))
+            tp.drawLine(0, 0, px - 1, 0)
+            tp.drawLine(0, 0, 0, px - 1)
+            tp.end()
+            brush = QBrush(tile)
+            # 瓦片原点与场景原点对齐，网格线落在 step 的整数倍上
+            brush.setTransform(QTransform.fromScale(step / px, step / px))
+            self._grid_brush_cache = brush
+            self._grid_key = key
+        return self._grid_brush_cache
 
     def drawBackground(self, painter, rect):
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, False)
-        painter.fillRect(rect, QColor(248, 250, 253))
         step = 40
-        light = QColor(225, 232, 245)
-        painter.setPen(QPen(light, 0))
-        x0 = int(rect.left()) - (int(rect.left()) % step)
-        y0 = int(rect.top()) - (int(rect.top()) % step)
-        for x in range(x0, int(rect.right()) + step, step):
-            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
-        for y in range(y0, int(rect.bottom()) + step, step):
-            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+        scale = painter.worldTransform().m11()
+        if step * scale < 4:
+            # 缩得太小时网格已看不清，只铺底色
+            painter.fillRect(rect, QColor(248, 250, 253))
+        else:
+            # 由 Qt 在 C++ 侧平铺瓦片，免去逐条画线
+            painter.fillRect(rect, self._grid_brush(step, scale))
         painter.restore()
 
     def show_guides(self, x=None, y=None):
@@ -1444,13 +1987,21 @@ class MindMapApp(QMainWindow):
         self.graph = nx.Graph()
         self.nodes = {}  # 名称 -> MindMapNode
 
-        # 初始化节点层级缓存
+        # 初始化节点层级缓存；代数在缓存清空/重建时递增，供连线判断弯曲方向缓存是否过期
         self._node_level_cache = {}
-
-        # 空间哈希用于近邻加速与碰撞检测 - 在加载设置后初始化
-        cell_size = self.SPATIAL_HASH_CELL_SIZE
-        self._spatial = _SpatialHash(cell=cell_size)
+        self._level_known = frozenset()  # 上次重建时图中已有的节点；其中未被 BFS 到的与根不连通，层级按 0
+        self._parent_of = {}  # 节点 -> BFS 树中的父节点，与层级缓存同建同废
+        self._level_root = None  # 层级缓存据以 BFS 的根；与当前有效根不同即视为过期
+        self._level_epoch = 0
+        # 图版本：拓扑或节点位置变化时递增，邻居角度缓存据此失效
+        self._graph_version = 0
+        self._neighbor_angles_cache = {}
+        self._edge_refresh_pending = False
+
+        # 空间哈希用于近邻加速与碰撞检测 - 在加载设置后初始化；此后始终存在，各处以 is not None 判断即可
+        self._spatial = _SpatialHash(cell=self.SPATIAL_HASH_CELL_SIZE)
         self._pos_cache = {}
+        self._avg_node_size_cache = None  # ((尺寸代数, 节点数), 平均对角线)
         self.edges = []
         self.selected_node = None
         self.last_anchor_name = None
@@ -1459,7 +2010,8 @@ class MindMapApp(QMainWindow):
         self.snap_step = self.SNAP_STEP
         self.align_threshold = self.ALIGN_THRESHOLD
 
-        self.undo_stack = []
+        # 定长双端队列：超出上限时自动丢弃最旧快照，免去 list.pop(0) 的整体搬移
+        self.undo_stack = deque(maxlen=int(self.HISTORY_LIMIT))
         self.redo_stack = []
         self._history_timer = QTimer(self)
         self._history_timer.setSingleShot(True)
@@ -1470,7 +2022,7 @@ class MindMapApp(QMainWindow):
 
         self.scene = MindMapScene(self)
         self.scene.selection_changed.connect(self.on_scene_selection_changed)
-        self.view = MindMapView(self.scene, self)
+        self.view = MindMapView(self.scene, self, use_opengl=self.USE_OPENGL)
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -1480,20 +2032,25 @@ class MindMapApp(QMainWindow):
         main_layout.addWidget(self.view, stretch=1)
         main_layout.addWidget(self.create_right_panel())
 
-        QShortcut(QKeySequence("Ctrl+D"), self, self.delete_node)
-        QShortcut(QKeySequence("Ctrl+S"), self, self.autosave)
-        QShortcut(QKeySequence("Ctrl+O"), self, self.import_map)
-        QShortcut(QKeySequence("Ctrl+Z"), self, self.undo)
-        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo)
-        QShortcut(QKeySequence("N"), self, self.add_node_smart_from_selection)
+        # 快捷键挂成窗口上的 QAction：按键直接用整数组合免去字符串解析，日后也可直接放进菜单
+        for keys, slot in (
+            (Qt.CTRL | Qt.Key_D, self.delete_node),
+            (Qt.CTRL | Qt.Key_S, self.autosave),
+            (Qt.CTRL | Qt.Key_O, self.import_map),
+            (Qt.CTRL | Qt.Key_Z, self.undo),
+            (Qt.CTRL | Qt.Key_Y, self.redo),
+            (Qt.Key_N, self.add_node_smart_from_selection),
+        ):
+            act = QAction(self)
+            act.setShortcut(QKeySequence(keys))
+            # triggered 会带上 checked 参数，吞掉它以免被当作 text 等可选参数传入
+            act.triggered.connect(lambda _checked=False, f=slot: f())
+            self.addAction(act)
 
         self._apply_stylesheet()
 
-        self._palette_cycle = [
-            QColor("#7EC8E3"), QColor("#8EE3C2"), QColor("#FFD166"),
-            QColor("#FF9F80"), QColor("#C6B3FF"), QColor("#F7A8B8"),
-            QColor("#9AD576"), QColor("#9AD0F5")
-        ]
+        # 与右键菜单共用同一份调色板；节点只读不改颜色对象，可直接共享实例
+        self._palette_cycle = tuple(QColor(hex_color) for _, hex_color in NODE_PALETTE)
         self._next_color_idx = 0
 
         self.refresh_node_list()
@@ -1514,46 +2071,12 @@ class MindMapApp(QMainWindow):
         logger.info("思维导图应用初始化完成")
 
     def load_all_settings(self):
-        """加载所有用户设置"""
+        """加载所有用户设置（缺失的键取 SETTINGS_DEFAULTS）"""
         try:
             if Path(SETTINGS_PATH).exists():
-                with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                
-                # 布局参数
-                self.TARGET_EDGE = settings.get('TARGET_EDGE', 180)
-                self.MIN_CHORD_RATIO = settings.get('MIN_CHORD_RATIO', 0.8)
-                self.MAX_EXTRA_STRETCH = settings.get('MAX_EXTRA_STRETCH', 3.0)
-                self.EDGE_LENGTH_FACTOR = settings.get('EDGE_LENGTH_FACTOR', 1.0)
-                self.SPATIAL_HASH_CELL_SIZE = settings.get('SPATIAL_HASH_CELL_SIZE', 120)
-                self.MIN_NODE_DISTANCE = settings.get('MIN_NODE_DISTANCE', 140)
-                
-                # 节点参数
-                self.NODE_FONT_SIZE = settings.get('NODE_FONT_SIZE', 12)
-                self.NODE_PADDING_X = settings.get('NODE_PADDING_X', 8)
-                self.NODE_PADDING_Y = settings.get('NODE_PADDING_Y', 6)
-                self.NODE_CORNER_RADIUS = settings.get('NODE_CORNER_RADIUS', 12)
-                
-                # 边参数
-                self.EDGE_BASE_RADIUS = settings.get('EDGE_BASE_RADIUS', 160.0)
-                self.EDGE_RING_SPACING = settings.get('EDGE_RING_SPACING', 160.0)
-                self.EDGE_CONTROL_POINT_RATIO = settings.get('EDGE_CONTROL_POINT_RATIO', 0.15)
-                self.EDGE_BEND_RATIO = settings.get('EDGE_BEND_RATIO', 0.05)
-                
-                # 排列算法参数
-                self.RADIAL_BASE_R = settings.get('RADIAL_BASE_R', 80.0)
-                self.RADIAL_MAX_CONE = settings.get('RADIAL_MAX_CONE', 120)
-                self.RADIAL_PAD_ARC = settings.get('RADIAL_PAD_ARC', 6.0)
-                self.RADIAL_STRETCH_STEP = settings.get('RADIAL_STRETCH_STEP', 40.0)
-                
-                # 视图参数
-                self.SNAP_STEP = settings.get('SNAP_STEP', 40)
-                self.ALIGN_THRESHOLD = settings.get('ALIGN_THRESHOLD', 8)
-                
-                # 性能参数
-                self.HISTORY_LIMIT = settings.get('HISTORY_LIMIT', 100)
-                self.AUTOSAVE_DELAY = settings.get('AUTOSAVE_DELAY', 300)
-                
+                settings = read_json_file(SETTINGS_PATH) or {}
+                for key, default in SETTINGS_DEFAULTS.items():
+                    setattr(self, key, settings.get(key, default))
             else:
                 # 使用默认值
                 self.set_default_settings()
@@ -1568,81 +2091,15 @@ class MindMapApp(QMainWindow):
 
     def set_default_settings(self):
         """设置所有参数的默认值"""
-        # 布局参数
-        self.TARGET_EDGE = 180
-        self.MIN_CHORD_RATIO = 0.8
-        self.MAX_EXTRA_STRETCH = 3.0
-        self.EDGE_LENGTH_FACTOR = 1.0
-        self.SPATIAL_HASH_CELL_SIZE = 120
-        self.MIN_NODE_DISTANCE = 140
-        
-        # 节点参数
-        self.NODE_FONT_SIZE = 12
-        self.NODE_PADDING_X = 8
-        self.NODE_PADDING_Y = 6
-        self.NODE_CORNER_RADIUS = 12
-        
-        # 边参数
-        self.EDGE_BASE_RADIUS = 160.0
-        self.EDGE_RING_SPACING = 160.0
-        self.EDGE_CONTROL_POINT_RATIO = 0.15
-        self.EDGE_BEND_RATIO = 0.05
-        
-        # 排列算法参数
-        self.RADIAL_BASE_R = 80.0
-        self.RADIAL_MAX_CONE = 120
-        self.RADIAL_PAD_ARC = 6.0
-        self.RADIAL_STRETCH_STEP = 40.0
-        
-        # 视图参数
-        self.SNAP_STEP = 40
-        self.ALIGN_THRESHOLD = 8
-        
-        # 性能参数
-        self.HISTORY_LIMIT = 100
-        self.AUTOSAVE_DELAY = 300
+        for key, default in SETTINGS_DEFAULTS.items():
+            setattr(self, key, default)
         
     def save_all_settings(self):
         """保存所有用户设置"""
         try:
-            settings = {
-                # 布局参数
-                'TARGET_EDGE': self.TARGET_EDGE,
-                'MIN_CHORD_RATIO': self.MIN_CHORD_RATIO,
-                'MAX_EXTRA_STRETCH': self.MAX_EXTRA_STRETCH,
-                'EDGE_LENGTH_FACTOR': self.EDGE_LENGTH_FACTOR,
-                'SPATIAL_HASH_CELL_SIZE': self.SPATIAL_HASH_CELL_SIZE,
-                'MIN_NODE_DISTANCE': self.MIN_NODE_DISTANCE,
-                
-                # 节点参数
-                'NODE_FONT_SIZE': self.NODE_FONT_SIZE,
-                'NODE_PADDING_X': self.NODE_PADDING_X,
-                'NODE_PADDING_Y': self.NODE_PADDING_Y,
-                'NODE_CORNER_RADIUS': self.NODE_CORNER_RADIUS,
-                
-                # 边参数
-                'EDGE_BASE_RADIUS': self.EDGE_BASE_RADIUS,
-                'EDGE_RING_SPACING': self.EDGE_RING_SPACING,
-                'EDGE_CONTROL_POINT_RATIO': self.EDGE_CONTROL_POINT_RATIO,
-                'EDGE_BEND_RATIO': self.EDGE_BEND_RATIO,
-                
-                # 排列算法参数
-                'RADIAL_BASE_R': self.RADIAL_BASE_R,
-                'RADIAL_MAX_CONE': self.RADIAL_MAX_CONE,
-                'RADIAL_PAD_ARC': self.RADIAL_PAD_ARC,
-                'RADIAL_STRETCH_STEP': self.RADIAL_STRETCH_STEP,
-                
-                # 视图参数
-                'SNAP_STEP': self.SNAP_STEP,
-                'ALIGN_THRESHOLD': self.ALIGN_THRESHOLD,
-                
-                # 性能参数
-                'HISTORY_LIMIT': self.HISTORY_LIMIT,
-                'AUTOSAVE_DELAY': self.AUTOSAVE_DELAY,
-            }
-            
-            with open(SETTINGS_PATH, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            settings = {key: getattr(self, key) for key in SETTINGS_DEFAULTS}
+            # 先写临时文件再替换，避免写到一半时崩溃留下残缺的设置文件
+            write_json_file_atomic(SETTINGS_PATH, settings)
             logger.info("所有设置已保存")
         except Exception as e:
             logger.error(f"保存设置失败: {e}")
@@ -1703,18 +2160,35 @@ class MindMapApp(QMainWindow):
     def _update_components_after_settings_change(self):
         """设置更改后更新相关组件"""
         # 更新空间哈希
-        if hasattr(self, '_spatial'):
-            self._spatial.cell = max(40, self.SPATIAL_HASH_CELL_SIZE)
+        # 格子尺寸变化时已登记的条目需按新尺寸重新分桶，否则查询会落到错误的格子
+        if self._spatial is not None and self._spatial.cell != max(40, int(self.SPATIAL_HASH_CELL_SIZE)):
+            self._rebuild_spatial_hash()
+            
+        # 历史上限变化时按新上限重建撤销栈（保留最近的快照）
+        if hasattr(self, 'undo_stack') and self.undo_stack.maxlen != int(self.HISTORY_LIMIT):
+            self.undo_stack = deque(self.undo_stack, maxlen=int(self.HISTORY_LIMIT))
             
         # 更新自动保存定时器
         if hasattr(self, '_autosave_timer'):
             self._autosave_timer.setInterval(self.AUTOSAVE_DELAY)
+
+        # 切换画布视口（OpenGL / 普通）
+        self.view.set_opengl(bool(self.USE_OPENGL))
             
-        # 更新所有边的路径
-        for edge in self.edges:
-            edge.update_path()
-            
-        # 更新场景中的节点外观（如果需要）
+        # 更新所有边的路径：合并到下一轮事件循环，连续多次设置变更只批量刷新一次
+        if not self._edge_refresh_pending:
+            self._edge_refresh_pending = True
+            QTimer.singleShot(0, self._refresh_all_edges_batched)
+
+    def _refresh_all_edges_batched(self):
+        self._edge_refresh_pending = False
+        viewport = self.view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            self.scene._recompute_edges_bulk(self.edges)
+        finally:
+            viewport.setUpdatesEnabled(True)
+        # 更新场景中的节点外观（如果需要），统一一次重绘
         self.scene.update()
 
     # 添加大纲视图方法：
@@ -1740,23 +2214,9 @@ class MindMapApp(QMainWindow):
         detailed_msg.exec_()
 
     def _apply_stylesheet(self):
-        self.setStyleSheet("""
-        QWidget { font-family: 'Segoe UI', 'Microsoft Yahei', 'PingFang SC', Arial; color:#203040; }
-        QMainWindow { background: #EEF3F9; }
-        #SidePanelLeft, #SidePanelRight { background: #F7FAFF; border: 1px solid #E3ECF7; border-radius: 14px; margin: 10px; }
-        QLabel { font-weight:600; color:#2A3D66; }
-        QPushButton { border: 1px solid #D6E2F1; padding: 10px 14px; margin: 8px 10px; min-height: 36px; border-radius: 10px; background: qlineargradient(x1:0,y1:0,x2:1,y2:1, stop:0 #ffffff, stop:1 #F3F8FF); }
-        QPushButton:hover { background: #EBF3FF; }
-        QPushButton:pressed { background: #E1ECFF; }
-        QLineEdit { margin: 8px 10px; padding: 8px 10px; border-radius: 8px; border: 1px solid #D6E2F1; background:#FFFFFF; }
-        QListWidget { margin: 8px 10px; border: 1px solid #D6E2F1; border-radius: 10px; background:#FFFFFF; }
-        QScrollBar:vertical { width: 10px; background: transparent; }
-        QScrollBar::handle:vertical { min-height:20px; background:#CFE0F4; border-radius:5px; }
-        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height:0; }
-        QScrollBar:horizontal { height: 10px; background: transparent; }
-        QScrollBar::handle:horizontal { min-width:20px; background:#CFE0F4; border-radius:5px; }
-        QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width:0; }
-        """)
+        # 样式表为常量，仅在构造时应用一次；避免重复 setStyleSheet 触发全部子控件重新解析样式
+        if self.styleSheet() != MAIN_WINDOW_STYLESHEET:
+            self.setStyleSheet(MAIN_WINDOW_STYLESHEET)
 
     @error_handler("创建左侧面板时出错")
     def create_left_sidebar(self):
@@ -1828,6 +2288,12 @@ class MindMapApp(QMainWindow):
         layout.addWidget(self.search_edit)
 
         self.list_widget = QListWidget()
+        self._listed_names: List[str] = []    # 列表控件当前各行的名称
+        self._name_to_row: Dict[str, int] = {}  # 名称 -> 行号，选择同步时 O(1) 定位
+        self._sorted_names: List[str] = []    # 按小写排序的全部节点名（缓存）
+        self._sorted_lower: List[str] = []    # 与上面逐项对应的小写名，搜索时免去逐个 lower()
+        self._sorted_names_for = frozenset()  # 上述缓存对应的节点名集合
+        self._filter_cache = None             # (名称集合, 过滤词, 命中下标)，续打字时在上次结果里收窄
         # 修改为单选模式
         self.list_widget.setSelectionMode(QListWidget.SingleSelection)
         self.list_widget.itemSelectionChanged.connect(self.on_list_selection_changed)
@@ -1839,29 +2305,72 @@ class MindMapApp(QMainWindow):
         """搜索文本变化时的防抖处理"""
         self._search_timer.start(300)  # 300ms防抖
 
+    @staticmethod
+    def _node_sort_key(name: str):
+        # 小写优先，原名兜底，保证全序以便逐行比对
+        return (name.lower(), name)
+
+    def _sorted_node_names(self) -> List[str]:
+        """节点名集合未变时复用上次的排序结果。"""
+        if self.nodes.keys() != self._sorted_names_for:
+            self._sorted_names = sorted(self.nodes, key=self._node_sort_key)
+            self._sorted_lower = [n.lower() for n in self._sorted_names]
+            self._sorted_names_for = frozenset(self.nodes)
+        return self._sorted_names
+
+    def _filter_node_names(self, filter_text: str) -> List[str]:
+        """按子串过滤已排序的节点名；新词是上次过滤词的延长时只在上次命中里继续筛。"""
+        names = self._sorted_node_names()
+        if not filter_text:
+            return names
+        lowered = self._sorted_lower
+        prev = self._filter_cache
+        if prev is not None and prev[0] is self._sorted_names_for and filter_text.startswith(prev[1]):
+            candidates = prev[2]
+        else:
+            candidates = range(len(names))
+        hits = [i for i in candidates if filter_text in lowered[i]]
+        self._filter_cache = (self._sorted_names_for, filter_text, hits)
+        return [names[i] for i in hits]
+
     @performance_monitor
     def refresh_node_list(self):
-        """优化性能的节点列表刷新"""
+        """优化性能的节点列表刷新：与现有行逐行比对，只增删有变化的行"""
         try:
             filter_text = (self.search_edit.text() if hasattr(self, 'search_edit') else "").strip().lower()
-            
-            # 使用生成器表达式提高性能
-            names = sorted(self.nodes.keys(), key=lambda s: s.lower())
-            
+
+            wanted = self._filter_node_names(filter_text)
+
+            lw = self.list_widget
             # 避免不必要的UI更新
-            self.list_widget.blockSignals(True)
+            lw.blockSignals(True)
             try:
-                self.list_widget.clear()
-                for name in names:
-                    if filter_text and filter_text not in name.lower():
-                        continue
-                    item = QListWidgetItem(name)
-                    self.list_widget.addItem(item)
-                    if self.selected_node and name == self.selected_node.name:
-                        item.setSelected(True)
+                current = self._listed_names
+                if current != wanted:
+                    key = self._node_sort_key
+                    lw.setUpdatesEnabled(False)
+                    try:
+                        # 两边同序，归并式对齐：多余的行删掉，缺少的行插入
+                        i = j = row = 0
+                        nc, nw = len(current), len(wanted)
+                        while i < nc or j < nw:
+                            if i < nc and j < nw and current[i] == wanted[j]:
+                                i += 1; j += 1; row += 1
+                            elif j >= nw or (i < nc and key(current[i]) < key(wanted[j])):
+                                lw.takeItem(row)
+                                i += 1
+                            else:
+                                lw.insertItem(row, QListWidgetItem(wanted[j]))
+                                row += 1; j += 1
+                    finally:
+                        lw.setUpdatesEnabled(True)
+                    self._listed_names = list(wanted)
+                    self._name_to_row = {n: i for i, n in enumerate(self._listed_names)}
+
+                self._select_list_row(self.selected_node.name if self.selected_node else None)
             finally:
-                self.list_widget.blockSignals(False)
-                
+                lw.blockSignals(False)
+
         except Exception as e:
             logger.error(f"刷新节点列表失败: {e}")
             raise
@@ -1882,24 +2391,20 @@ class MindMapApp(QMainWindow):
             # 优化列表选择更新
             self.list_widget.blockSignals(True)
             try:
-                # 清除所有选择
-                for i in range(self.list_widget.count()):
-                    item = self.list_widget.item(i)
-                    item.setSelected(False)
-                
-                # 选择当前选中的节点
-                if selected_name:
-                    for i in range(self.list_widget.count()):
-                        item = self.list_widget.item(i)
-                        if item.text() == selected_name:
-                            item.setSelected(True)
-                            break
+                self._select_list_row(selected_name)
             finally:
                 self.list_widget.blockSignals(False)
                 
         except Exception as e:
             logger.error(f"场景选择变更处理失败: {e}")
 
+    def _select_list_row(self, name: Optional[str]):
+        """清除列表选择并选中 name 对应的行（由 _name_to_row 直接定位）。"""
+        self.list_widget.clearSelection()
+        row = self._name_to_row.get(name) if name else None
+        if row is not None:
+            self.list_widget.item(row).setSelected(True)
+
     def on_list_selection_changed(self):
         try:
             selected_items = self.list_widget.selectedItems()
@@ -1907,8 +2412,7 @@ class MindMapApp(QMainWindow):
                 # 列表中没有选择，清除场景选择
                 self.scene.blockSignals(True)
                 try:
-                    for item in list(self.scene.selectedItems()):
-                        item.setSelected(False)
+                    self.scene.clearSelection()
                     self.selected_node = None
                 finally:
                     self.scene.blockSignals(False)
@@ -1920,14 +2424,16 @@ class MindMapApp(QMainWindow):
             # 优化场景选择更新
             self.scene.blockSignals(True)
             try:
-                # 清除所有选择
-                for item in list(self.scene.selectedItems()):
-                    item.setSelected(False)
+                node = self.nodes.get(wanted_name)
+                selected = self.scene.selectedItems()
+                if node is None or not (len(selected) == 1 and selected[0] is node):
+                    # 一次性清除所有选择
+                    self.scene.clearSelection()
+                    if node is not None:
+                        node.setSelected(True)
                     
                 # 选择对应的节点
-                if wanted_name in self.nodes:
-                    node = self.nodes[wanted_name]
-                    node.setSelected(True)
+                if node is not None:
                     self.selected_node = node
                     self.last_anchor_name = wanted_name
                     self.set_root_node(wanted_name)
@@ -1943,16 +2449,16 @@ class MindMapApp(QMainWindow):
             return
             
         try:
-            # 优化选择操作
-            self.scene.blockSignals(True)
-            try:
-                # 清除所有选择
-                for item in list(self.scene.selectedItems()):
-                    item.setSelected(False)
-                # 选择指定节点
-                node.setSelected(True)
-            finally:
-                self.scene.blockSignals(False)
+            # 已是唯一选中项时不必先清后选，省去两次选择状态变更与重绘
+            selected = self.scene.selectedItems()
+            if not (len(selected) == 1 and selected[0] is node):
+                self.scene.blockSignals(True)
+                try:
+                    # 一次性清除所有选择，再选中指定节点
+                    self.scene.clearSelection()
+                    node.setSelected(True)
+                finally:
+                    self.scene.blockSignals(False)
                 
             self.selected_node = node
             self.last_anchor_name = node.name
@@ -1973,7 +2479,7 @@ class MindMapApp(QMainWindow):
         """保证存在根节点，并返回有效根节点名称"""
         try:
             if not self.nodes:
-                center = self.view.mapToScene(self.view.viewport().rect().center())
+                center = self.view.viewport_center_scene()
                 node = self._create_node_at("思维导图", self._snap(center))
                 self.set_root_node(node.name)
                 self.select_node(node)
@@ -2002,23 +2508,14 @@ class MindMapApp(QMainWindow):
             if self.root_node_name and self.root_node_name in self.nodes:
                 return self.root_node_name
             if self.nodes:
-                center = self.view.mapToScene(self.view.viewport().rect().center())
-                closest_node = None
-                min_distance = float('inf')
-                
-                # 优化距离计算
-                for name, node in self.nodes.items():
-                    node_pos = node.pos()
-                    distance = math.hypot(node_pos.x() - center.x(), node_pos.y() - center.y())
-                    if distance < min_distance:
-                        min_distance = distance
-                        closest_node = name
+                center = self.view.viewport_center_scene()
+                closest_node = self._nearest_node_to(center.x(), center.y())
                         
                 if closest_node:
                     self.set_root_node(closest_node)
                     return closest_node
                     
-                first_node = list(self.nodes.keys())[0]
+                first_node = next(iter(self.nodes))
                 self.set_root_node(first_node)
                 return first_node
                 
@@ -2027,6 +2524,40 @@ class MindMapApp(QMainWindow):
             logger.error(f"获取有效根节点失败: {e}")
             return self._ensure_root_node_exists()
 
+    def _nearest_node_to(self, x: float, y: float):
+        """返回离 (x, y) 最近的节点名：先在空间哈希中由近及远扩圈查询，查询面积超过节点数时退回全量扫描"""
+        nodes = self.nodes
+        spatial = getattr(self, '_spatial', None)
+        if spatial is not None:
+            cell = spatial.cell
+            r = float(cell)
+            # 扫描的格子数 (2r/cell)^2 一旦超过节点数，扩圈就不再划算
+            while (2.0 * r / cell) ** 2 <= len(nodes):
+                best, best_d2 = None, r * r
+                for nm in spatial.iter_neighbors(x, y, r):
+                    node = nodes.get(nm)
+                    if node is None:
+                        continue
+                    p = node.pos()
+                    dx, dy = p.x() - x, p.y() - y
+                    d2 = dx * dx + dy * dy
+                    if d2 <= best_d2:
+                        best, best_d2 = nm, d2
+                # 只有落在半径 r 内的命中才能保证是全局最近
+                if best is not None:
+                    return best
+                r *= 2.0
+        closest_node = None
+        min_d2 = float('inf')
+        for name, node in nodes.items():
+            p = node.pos()
+            dx, dy = p.x() - x, p.y() - y
+            d2 = dx * dx + dy * dy
+            if d2 < min_d2:
+                min_d2 = d2
+                closest_node = name
+        return closest_node
+
     def _ensure_unique_name(self, proposal: str, exclude=None, used_set=None) -> str:
         """确保名称唯一性，自动处理冲突"""
         # 处理空名称
@@ -2049,9 +2580,10 @@ class MindMapApp(QMainWindow):
             i += 1
 
     def _next_color(self) -> QColor:
-        c = self._palette_cycle[self._next_color_idx % len(self._palette_cycle)]
+        palette = self._palette_cycle
+        c = palette[self._next_color_idx % len(palette)]
         self._next_color_idx += 1
-        return QColor(c)
+        return c
 
     @error_handler("更新节点名称时出错")
     def _update_node_name_in_graph(self, node: MindMapNode, old_name: str, new_name: str):
@@ -2066,14 +2598,24 @@ class MindMapApp(QMainWindow):
             
         try:
             if self.graph.has_node(old_name):
-                pos = self.graph.nodes[old_name].get('pos', (0, 0))
-                color = self.graph.nodes[old_name].get('color', "#7EC8E3")
-                
-                self.graph = nx.relabel_nodes(self.graph, {old_name: new_name})
-                self.graph.nodes[new_name]['pos'] = pos
-                self.graph.nodes[new_name]['color'] = color
+                # 原地改键：只搬动这一个节点及其邻边，不重建整张图
+                G = self.graph
+                attrs = dict(G.nodes[old_name])
+                attrs.setdefault('pos', (0, 0))
+                attrs.setdefault('color', "#7EC8E3")
+                edge_data = [(n, dict(d)) for n, d in G.adj[old_name].items()]
+                G.remove_node(old_name)
+                G.add_node(new_name, **attrs)
+                # 自环的另一端也是旧名，需一并换成新名，否则会把旧名重新建成孤立节点
+                G.add_edges_from((new_name, new_name if n == old_name else n, d) for n, d in edge_data)
                 
                 self.nodes[new_name] = self.nodes.pop(old_name)
+                # 空间哈希与坐标镜像按名称索引，需同步改键
+                if old_name in self._pos_cache:
+                    self._pos_cache[new_name] = self._pos_cache.pop(old_name)
+                if self._spatial is not None and old_name in self._spatial.active:
+                    self._spatial.remove(old_name, node.x(), node.y())
+                    self._spatial.insert(new_name, node.x(), node.y(), self._node_radius_px(new_name))
                 
                 if self.root_node_name == old_name:
                     self.root_node_name = new_name
@@ -2081,6 +2623,8 @@ class MindMapApp(QMainWindow):
                     self.selected_node = node
                 if self.last_anchor_name == old_name:
                     self.last_anchor_name = new_name
+                # 层级缓存与 BFS 父节点表按名称记录，子节点的 _parent_of 仍指向旧名，整体作废重建
+                self._invalidate_node_levels()
                     
             self.refresh_node_list()
             self.push_history("rename")
@@ -2092,36 +2636,52 @@ class MindMapApp(QMainWindow):
             # 不再回滚节点名称，避免递归
 
     def _is_pos_free(self, pos: QPointF, min_dist=140) -> bool:
+        return self._is_xy_free(pos.x(), pos.y(), min_dist)
+
+    def _is_xy_free(self, px: float, py: float, min_dist=140, r_new=None) -> bool:
+        """_is_pos_free 的坐标版：批量判定时由调用方预先算好 r_new，省去逐点的 QPointF 与半径估算。"""
         # spatial-hash accelerated neighborhood test
-        px, py = pos.x(), pos.y()
-        r_new = max(min_dist * 0.5, self._node_radius_px(None))
-        if hasattr(self, '_spatial'):
-            for nm in self._spatial.neighbors(px, py, r_new):
-                other = self.nodes.get(nm)
-                if not other:
+        if r_new is None:
+            r_new = max(min_dist * 0.5, self._node_radius_px(None))
+        nodes = self.nodes
+        spatial = self._spatial
+        if spatial is not None:
+            # 坐标取 _pos_cache 中的镜像，比较平方距离，免去逐个 Qt 调用与开方
+            pos_get = self._pos_cache.get
+            radius_get = spatial.radius.get
+            for nm in spatial.iter_neighbors(px, py, r_new):
+                if nm not in nodes:
                     continue
-                r_sum = self._spatial.radius.get(nm, self._node_radius_px(nm)) + r_new
-                dx = other.x() - px
-                dy = other.y() - py
-                if (dx*dx + dy*dy) ** 0.5 < r_sum:
+                xy = pos_get(nm)
+                if xy is None:
+                    other = nodes[nm]
+                    xy = (other.x(), other.y())
+                r = radius_get(nm)
+                if r is None:
+                    r = self._node_radius_px(nm)
+                r_sum = r + r_new
+                dx = xy[0] - px
+                dy = xy[1] - py
+                if dx*dx + dy*dy < r_sum * r_sum:
                     return False
             return True
         # fallback: scan all
-        for other in self.nodes.values():
+        min_d2 = min_dist * min_dist
+        for other in nodes.values():
             dx = other.x() - px
             dy = other.y() - py
-            if math.hypot(dx, dy) < min_dist:
+            if dx*dx + dy*dy < min_d2:
                 return False
         return True
 
     def _node_radius_px(self, name=None):
         # estimate node "radius" using bounding rect diagonal / 2 plus small buffer
+        if name:
+            node = self.nodes.get(name)
+            if node is not None:
+                return node.radius_px  # 尺寸变化时由节点自行更新
         try:
-            if name and name in self.nodes:
-                rect = self.nodes[name].boundingRect()
-                diag = (rect.width()**2 + rect.height()**2) ** 0.5
-            else:
-                diag = max(120.0, float(self._calculate_average_node_size()))
+            diag = max(120.0, float(self._calculate_average_node_size()))
         except Exception:
             diag = 140.0
         return diag * 0.5 + 10.0
@@ -2131,27 +2691,10 @@ class MindMapApp(QMainWindow):
         return QPointF(round(p.x() / step) * step, round(p.y() / step) * step)
 
     def _pick_angle_in_largest_gap(self, anchor_item: 'MindMapNode') -> float:
-        anchor_pos = anchor_item.pos()
-        neighbor_names = list(self.graph.neighbors(anchor_item.name)) if self.graph.has_node(anchor_item.name) else []
-        angles = []
-        for nb in neighbor_names:
-            if nb in self.nodes:
-                p = self.nodes[nb].pos()
-                angles.append(_angle_between(anchor_pos, p))
+        angles = self._neighbors_angles(anchor_item)
         if not angles:
             return 0.0
-        angles = sorted(angles)
-        twopi = 2.0 * math.pi
-        gaps = []
-        for i in range(len(angles)):
-            a = angles[i]
-            b = angles[(i + 1) % len(angles)]
-            gap = (b - a) if i < len(angles) - 1 else (b + twopi - a)
-            gaps.append((gap, a, b))
-        gaps.sort(key=lambda x: x[0], reverse=True)
-        max_gap, a, b = gaps[0]
-        mid = a + max_gap / 2.0
-        return _angle_normalize(mid)
+        return _largest_gap_mid(angles)
 
     @performance_monitor
     @error_handler("智能添加节点时出错")
@@ -2172,6 +2715,10 @@ class MindMapApp(QMainWindow):
 
         node_item = self._create_node_at(name, pos, color)
         self.graph.add_edge(anchor_item.name, name)
+        # 根不变时新叶子不改变其他节点的层级：登记它自己即可，层级缓存保留（push_history 不再因 add_child 清空）；
+        # 下面 select_node 若改设根，缓存记下的根与之不符，下次查询时按新根重建
+        self._note_leaf_level(anchor_item.name, name)
+        self._bump_graph_version()
         self.create_edge(anchor_item, node_item)
 
         self.select_node(node_item)
@@ -2179,15 +2726,31 @@ class MindMapApp(QMainWindow):
         logger.info(f"添加子节点: {name} -> {anchor_item.name}")
 
     def _neighbors_angles(self, anchor_item: 'MindMapNode'):
-        """优化邻居角度计算"""
-        center = anchor_item.pos()
-        angles = []
-        if self.graph.has_node(anchor_item.name):
-            for nb in self.graph.neighbors(anchor_item.name):
-                if nb in self.nodes:
-                    p = self.nodes[nb].pos()
-                    angles.append(_angle_between(center, p))
-        return sorted(angles)
+        """优化邻居角度计算：同一图版本内按锚点缓存已排序结果（只读元组，调用方不得修改）"""
+        key = (anchor_item.name, self._graph_version)
+        hit = self._neighbor_angles_cache.get(key)
+        if hit is not None:
+            return hit
+        if not self.graph.has_node(anchor_item.name):
+            return ()
+        # 坐标取 _pos_cache 镜像，缺失时才回退到 Qt 调用
+        nodes = self.nodes
+        pos_get = self._pos_cache.get
+        coords = []
+        for nb in self.graph.neighbors(anchor_item.name):
+            xy = pos_get(nb)
+            if xy is None:
+                node = nodes.get(nb)
+                if node is None:
+                    continue
+                xy = (node.x(), node.y())
+            elif nb not in nodes:
+                continue
+            coords.append(xy)
+        angles = _angles_between(anchor_item.x(), anchor_item.y(), coords)
+        angles.sort()
+        hit = self._neighbor_angles_cache[key] = tuple(angles)
+        return hit
 
     def _min_radius_to_fit_gap(self, gap_width: float, min_chord: float) -> float:
         gap = max(1e-3, gap_width)
@@ -2196,19 +2759,15 @@ class MindMapApp(QMainWindow):
             return float("inf")
         return (min_chord / 2.0) / s
 
-    def _spiral_offsets(self, step_deg: float, limit_deg: float):
-        step = math.radians(max(1.0, step_deg))
-        limit = math.radians(max(step_deg, limit_deg))
-        k = 1
-        while k * step <= limit + 1e-9:
-            yield +k * step
-            yield -k * step
-            k += 1
-
     def _calculate_average_node_size(self):
-        """计算所有节点的平均大小"""
+        """计算所有节点的平均大小（节点增删或任一节点尺寸变化前复用上次结果）"""
         if not self.nodes:
             return 140  # 默认值
+        # 新增节点必然触发尺寸代数递增，删除节点必然改变节点数，二者合起来即可判定失效
+        key = (MindMapNode.geometry_epoch, len(self.nodes))
+        hit = self._avg_node_size_cache
+        if hit is not None and hit[0] == key:
+            return hit[1]
             
         total_width = 0
         total_height = 0
@@ -2227,6 +2786,7 @@ class MindMapApp(QMainWindow):
         avg_height = total_height / count
         # 使用节点对角线长度作为基础弦长
         avg_diagonal = math.sqrt(avg_width**2 + avg_height**2)
+        self._avg_node_size_cache = (key, avg_diagonal)
         return avg_diagonal
 
     @performance_monitor
@@ -2248,31 +2808,23 @@ class MindMapApp(QMainWindow):
         angles = self._neighbors_angles(anchor_item)
 
         # 2) "父向锥形"与"兄弟连续角"偏好
+        # 父节点在建层级缓存的同一趟 BFS 中记下；先查层级以确保缓存有效
         try:
-            anchor_level = self._get_node_level(anchor_item.name)
+            self._get_node_level(anchor_item.name)
         except Exception:
-            anchor_level = 0
-        parent_name = None
-        if self.graph.has_node(anchor_item.name):
-            al = anchor_level
-            for nb in self.graph.neighbors(anchor_item.name):
-                try:
-                    if self._get_node_level(nb) < al:
-                        parent_name = nb
-                        break
-                except Exception:
-                    pass
+            pass
+        parent_name = self._parent_of.get(anchor_item.name)
         if parent_name and parent_name in self.nodes:
             pref_angle = _angle_between(self.nodes[parent_name].pos(), anchor_item.pos())
         else:
             pref_angle = 0.0  # 根或无父：默认向右
 
         # 兄弟"连续角"记忆：让新增子节点沿着上一个子角继续"扇出"
+        # meta 即图中该节点的属性字典本身，下面的读写都直接作用于它，不再经 NodeView 反复查找
         meta = self.graph.nodes.get(anchor_item.name, {})
         last_child_angle = meta.get('last_child_angle', None)
-        golden = math.radians(137.50776405003785)  # 黄金角
         if last_child_angle is not None:
-            pref_angle = last_child_angle + golden
+            pref_angle = last_child_angle + RADIAL_GOLDEN_INCREMENT
 
         # 3) 可用扇区
         if not angles:
@@ -2282,13 +2834,7 @@ class MindMapApp(QMainWindow):
             ang_center = _angle_normalize(pref_angle)
             sector = (a0, gap_width)
         else:
-            gaps = []
-            for i, a in enumerate(angles):
-                b = angles[(i + 1) % len(angles)]
-                gap = (b - a) if i < len(angles) - 1 else (b + twopi - a)
-                gaps.append((gap, a))
-            gaps.sort(key=lambda x: x[0], reverse=True)
-            gap_width, a = gaps[0]
+            gap_width, a = _largest_gap(angles)
             ang_center = _angle_normalize(a + gap_width / 2.0)
             a0 = (a + pad) % twopi
             gap_width = max(1e-3, gap_width - 2 * pad)
@@ -2305,54 +2851,56 @@ class MindMapApp(QMainWindow):
             rings_up = math.ceil((r0 - base_radius) / ring)
             r0 = base_radius + rings_up * ring
 
-        # 角度候选（扇区中心优先，然后对称扩展）
-        def angle_candidates(center_angle, limit_deg):
-            yield center_angle
-            step = math.radians(10.0)
-            limit = math.radians(max(10.0, limit_deg))
-            k = 1
-            while k * step <= limit + 1e-9:
-                yield _angle_normalize(center_angle + k * step)
-                yield _angle_normalize(center_angle - k * step)
-                k += 1
+        # 候选点逐个吸附到网格后做碰撞判定；新节点半径估算与吸附步长对所有候选相同，只取一次
+        step = self.snap_step
+        r_new = max(global_min_dist * 0.5, self._node_radius_px(None))
+
+        # 尚无邻居（新节点的第一个孩子）：完整搜索的首个候选就是偏好角、首圈，先单独试一次
+        if not angles:
+            sx = round((center.x() + r0 * math.cos(ang_center)) / step) * step
+            sy = round((center.y() + r0 * math.sin(ang_center)) / step) * step
+            if self._is_xy_free(sx, sy, global_min_dist, r_new):
+                meta['last_child_angle'] = float(ang_center)
+                return ang_center, r0
 
         # 父向锥限制（孩子越多锥越窄）
         cone_deg = max(60.0, 120.0 - 10.0 * len(angles))
+        cone_rad = math.radians(cone_deg)
+        sec_a0, sec_width = sector
+        full_circle = sec_width >= twopi - 1e-3
         def in_sector(x):
-            a0, width = sector
-            hi = (a0 + width) % twopi
-            if width >= twopi - 1e-3:
-                ok = True
-            elif hi < a0:
-                ok = (x >= a0 or x <= hi)
-            else:
-                ok = (a0 <= x <= hi)
-            delta = abs((_angle_normalize(x - pref_angle) + math.pi) % (2*math.pi) - math.pi)
-            return ok and (delta <= math.radians(cone_deg))
+            # 与偏好角的环绕角距（-π, π]，超出锥角直接淘汰
+            if abs((x - pref_angle + math.pi) % twopi - math.pi) > cone_rad:
+                return False
+            # 从扇区起点逆时针量到 x 的角度不超过扇区宽度即在扇区内，跨 0 回绕无需分支
+            return full_circle or (x - sec_a0) % twopi <= sec_width
 
         angle_limit_deg = min(170.0, math.degrees(sector[1]) * 0.5)
-        for ring_i in range(max_rings + 1):
-            r = r0 + ring_i * ring
-            for ang in angle_candidates(ang_center, angle_limit_deg):
-                if not in_sector(ang):
-                    continue
-                # 轻微抖动
-                jitter = 0.0 if ring_i == 0 else min(8.0, ring * 0.02)
-                x = center.x() + r * math.cos(ang) + (jitter * (0.5 - (hash((anchor_item.name, ang, r)) & 1023) / 1023.0))
-                y = center.y() + r * math.sin(ang) + (jitter * (0.5 - (hash((r, ang, anchor_item.name)) & 1023) / 1023.0))
-                p = self._snap(QPointF(x, y))
-                if self._is_pos_free(p, global_min_dist):
-                    # 记录"上次子角"
-                    self.graph.nodes[anchor_item.name]['last_child_angle'] = float(ang)
-                    return ang, r
+        # 候选角与各圈无关：扇区过滤与三角函数只算一次，各圈复用
+        cand_trig = [(ang, math.cos(ang), math.sin(ang))
+                     for ang in _angle_candidates(ang_center, angle_limit_deg) if in_sector(ang)]
+        # 相邻候选吸附后常落在同一网格点上，已判定为占用的点不再重复查询空间哈希
+        occupied = set()
+        # str 的哈希值有缓存，不再逐候选构造元组求哈希
+        for ang, r, x, y in _slot_candidates(center.x(), center.y(), cand_trig, r0, ring, max_rings,
+                                             hash(anchor_item.name)):
+            snapped = (round(x / step) * step, round(y / step) * step)
+            if snapped in occupied:
+                continue
+            if self._is_xy_free(snapped[0], snapped[1], global_min_dist, r_new):
+                # 记录"上次子角"
+                meta['last_child_angle'] = float(ang)
+                return ang, r
+            occupied.add(snapped)
 
         # 兜底
-        self.graph.nodes[anchor_item.name]['last_child_angle'] = float(ang_center)
+        meta['last_child_angle'] = float(ang_center)
         return ang_center, r0 + ring
 
     def _create_node_at(self, name: str, pos: QPointF, color: QColor=None) -> 'MindMapNode':
         if color is None:
             color = self._next_color()
+        name = sys.intern(name)
             
         self.graph.add_node(name)
         self.graph.nodes[name]['pos'] = (pos.x(), pos.y())
@@ -2373,7 +2921,8 @@ class MindMapApp(QMainWindow):
         )
         node_item.setPos(pos)
         node_item.moved.connect(self._on_node_moved)
-        node_item.color_changed.connect(lambda _: self._on_node_color_changed(name))
+        # 名称在信号触发时从节点读取，重命名后仍指向正确的条目
+        node_item.color_changed.connect(lambda ni: self._on_node_color_changed(ni.name))
         node_item.renamed.connect(self._on_node_renamed)
         
         self.scene.addItem(node_item)
@@ -2381,7 +2930,7 @@ class MindMapApp(QMainWindow):
         # 空间哈希登记
         try:
             self._pos_cache[name] = (pos.x(), pos.y())
-            if hasattr(self, '_spatial'):
+            if self._spatial is not None:
                 self._spatial.insert(name, pos.x(), pos.y(), self._node_radius_px(name))
         except Exception:
             pass
@@ -2394,34 +2943,35 @@ class MindMapApp(QMainWindow):
         return node_item
 
     def _on_node_moved(self, node):
-        if not hasattr(self, 'nodes') or node.name not in self.nodes:
+        name = node.name
+        if name not in self.nodes:
             return
             
         try:
+            self._bump_graph_version()
             self.scene.update_connections_for(node)
             
-            if hasattr(self, '_history_timer') and self._history_timer.isActive():
-                self._history_timer.stop()
+            # 单次定时器重新 start 即推迟，拖动过程中只在停下后记录/保存一次
             self._history_timer.start(250)
+            self._schedule_autosave()
             
-            if hasattr(self, '_autosave_timer') and self._autosave_timer.isActive():
-                self._autosave_timer.stop()
-            self._autosave_timer.start(300)
-            
-            # 修复空间哈希位置同步
+            # 修复空间哈希位置同步（拖动时每帧触发，属性取到局部变量）
+            spatial = self._spatial
+            pos_cache = self._pos_cache
+            x, y = node.x(), node.y()
+            oldx, oldy = pos_cache.get(name, (x, y))
             try:
-                oldx, oldy = self._pos_cache.get(node.name, (node.x(), node.y()))
-                if hasattr(self, '_spatial') and self._spatial is not None:
-                    self._spatial.move(node.name, oldx, oldy, node.x(), node.y())
-                self._pos_cache[node.name] = (node.x(), node.y())
+                if spatial is not None:
+                    spatial.move(name, oldx, oldy, x, y)
+                pos_cache[name] = (x, y)
             except Exception as e:
                 logger.warning(f"空间哈希更新失败: {e}")
                 # 重试一次
                 try:
-                    if hasattr(self, '_spatial') and self._spatial is not None:
-                        self._spatial.remove(node.name, oldx, oldy)
-                        self._spatial.insert(node.name, node.x(), node.y(), self._node_radius_px(node.name))
-                    self._pos_cache[node.name] = (node.x(), node.y())
+                    if spatial is not None:
+                        spatial.remove(name, oldx, oldy)
+                        spatial.insert(name, x, y, self._node_radius_px(name))
+                    pos_cache[name] = (x, y)
                 except Exception as retry_e:
                     logger.error(f"空间哈希重试更新失败: {retry_e}")
                     # 如果重试也失败，重建整个空间哈希
@@ -2432,15 +2982,16 @@ class MindMapApp(QMainWindow):
     def _rebuild_spatial_hash(self):
         """重建整个空间哈希"""
         try:
-            if hasattr(self, '_spatial') and self._spatial is not None:
-                self._spatial = _SpatialHash(cell=self.SPATIAL_HASH_CELL_SIZE)
+            if self._spatial is not None:
+                entries = []
                 for name, node in self.nodes.items():
                     if name in self._pos_cache:
                         x, y = self._pos_cache[name]
                     else:
                         x, y = node.x(), node.y()
                         self._pos_cache[name] = (x, y)
-                    self._spatial.insert(name, x, y, self._node_radius_px(name))
+                    entries.append((name, x, y, self._node_radius_px(name)))
+                self._spatial.rebuild(entries, cell=self.SPATIAL_HASH_CELL_SIZE)
                 logger.info("空间哈希已重建")
         except Exception as e:
             logger.error(f"重建空间哈希失败: {e}")
@@ -2457,35 +3008,66 @@ class MindMapApp(QMainWindow):
 
     def _get_node_level(self, node_name):
         """计算节点在树结构中的层级（从根节点开始的深度）"""
-        # 如果缓存不存在或为空，重新计算
-        if not hasattr(self, '_node_level_cache') or not self._node_level_cache:
+        # 选中节点会改设根节点（如新增子节点后选中它），层级须按新根重算
+        if self._level_root != self._get_effective_root_node():
             self._rebuild_node_level_cache()
-        
-        # 如果节点不在缓存中，也重新计算
-        if node_name not in self._node_level_cache:
-            self._rebuild_node_level_cache()
-            
+        level = self._node_level_cache.get(node_name)
+        if level is not None:
+            return level
+        # 上次重建时已存在却没被 BFS 到：与根不连通，不必为它反复整图重建
+        if node_name in self._level_known:
+            return 0
+        # 缓存已作废或是重建后新增的节点，重新计算
+        self._rebuild_node_level_cache()
         return self._node_level_cache.get(node_name, 0)
 
+    def _note_leaf_level(self, parent_name, leaf_name):
+        """新叶子只挂在一个父节点下，根不变时不影响其他节点的层级：父层级已知时直接登记，免去整图重建。
+        之后若根改变，_get_node_level 会发现缓存所基于的根已不同而整体重建。"""
+        level = self._node_level_cache.get(parent_name)
+        if level is not None:
+            self._node_level_cache[leaf_name] = level + 1
+            self._parent_of[leaf_name] = parent_name
+
+    def _invalidate_node_levels(self):
+        """拓扑或根节点变化后清空层级缓存"""
+        self._node_level_cache.clear()
+        self._parent_of.clear()
+        self._level_known = frozenset()
+        self._level_root = None
+        self._level_epoch += 1
+        self._bump_graph_version()
+
+    def _bump_graph_version(self):
+        self._graph_version += 1
+        self._neighbor_angles_cache.clear()
+
     def _rebuild_node_level_cache(self):
         """重建节点层级缓存"""
         self._node_level_cache = {}
-        root = self._get_effective_root_node()
+        self._parent_of = {}
+        self._level_epoch += 1
+        self._level_known = frozenset(self.graph)
+        root = self._level_root = self._get_effective_root_node()
         if not root:
             return
             
-        visited = set()
-        queue = [(root, 0)]
+        # 入队即登记层级：每个节点只入队一次，popleft 为 O(1)
+        cache = self._node_level_cache
+        parent_of = self._parent_of
+        cache[root] = 0
+        queue = deque([root])
+        adj = self.graph.adj
         while queue:
-            current, level = queue.pop(0)
-            if current in visited:
+            current = queue.popleft()
+            if current not in adj:
                 continue
-            visited.add(current)
-            self._node_level_cache[current] = level
-            if self.graph.has_node(current):
-                for nb in self.graph.neighbors(current):
-                    if nb not in visited:
-                        queue.append((nb, level + 1))
+            level = cache[current] + 1
+            for nb in adj[current]:
+                if nb not in cache:
+                    cache[nb] = level
+                    parent_of[nb] = current
+                    queue.append(nb)
                       
     @error_handler("删除节点时出错")
     def delete_specific_node(self, node_item: MindMapNode):
@@ -2495,10 +3077,10 @@ class MindMapApp(QMainWindow):
             
         try:
             name = node_item.name
-            self._autosave_timer.start(300)
+            self._schedule_autosave()
             # 空间哈希删除登记
             try:
-                if hasattr(self, '_spatial'):
+                if self._spatial is not None:
                     self._spatial.remove(name, node_item.x(), node_item.y())
                 self._pos_cache.pop(name, None)
             except Exception:
@@ -2522,9 +3104,10 @@ class MindMapApp(QMainWindow):
                 
             # 处理根节点重新选择
             if name == self.root_node_name:
-                remaining_nodes = [n for n in self.nodes.keys() if n != name]
-                if remaining_nodes:
-                    self.root_node_name = remaining_nodes[0]
+                # 只需第一个其他节点，不必先列出全部
+                new_root = next((n for n in self.nodes if n != name), None)
+                if new_root is not None:
+                    self.root_node_name = new_root
                     self.statusBar().showMessage(f"已自动将 '{self.root_node_name}' 设为新根节点", 2000)
                     logger.info(f"自动设置新根节点: {self.root_node_name}")
                 else:
@@ -2561,8 +3144,7 @@ class MindMapApp(QMainWindow):
                 self.last_anchor_name = None
                 
             # 清空层级缓存
-            if hasattr(self, '_node_level_cache'):
-                self._node_level_cache.clear()
+            self._invalidate_node_levels()
                 
             self.refresh_node_list()
             self.push_history("delete")
@@ -2601,8 +3183,7 @@ class MindMapApp(QMainWindow):
             self.graph.add_edge(src, target_name)
             self.create_edge(self.nodes[src], self.nodes[target_name])
             # 清空层级缓存
-            if hasattr(self, '_node_level_cache'):
-                self._node_level_cache.clear()
+            self._invalidate_node_levels()
             self.push_history("connect")
             logger.info(f"连接节点: {src} -> {target_name}")
 
@@ -2631,14 +3212,12 @@ class MindMapApp(QMainWindow):
                         self.edges.remove(edge)
                     break
             # 清空层级缓存
-            if hasattr(self, '_node_level_cache'):
-                self._node_level_cache.clear()
+            self._invalidate_node_levels()
             self.push_history("disconnect")
             logger.info(f"断开连接: {src} - {target_name}")
 
     def update_all_edges(self):
-        for e in self.edges:
-            e.update_path()
+        self.scene._recompute_edges_bulk(self.edges)
 
     def import_map(self):
         fmt, ok = QInputDialog.getItem(self, "选择导入格式", "请选择格式:", ["JSON", "Markdown"], 0, False)
@@ -2658,11 +3237,17 @@ class MindMapApp(QMainWindow):
         else:
             self.export_map_markdown()
 
-    def _sync_graph_from_scene(self):
-        for name, item in self.nodes.items():
-            if self.graph.has_node(name):
-                self.graph.nodes[name]['pos'] = (item.x(), item.y())
-                self.graph.nodes[name]['color'] = qcolor_to_hex(item.color)
+    def _synced_node_link(self) -> dict:
+        """场景回写与 graph_to_node_link 合成一趟：回写坐标/颜色的同时生成节点字典。"""
+        items = self.nodes
+        nodes_out = []
+        for name, attrs in self.graph.nodes.items():
+            item = items.get(name)
+            if item is not None:
+                attrs['pos'] = (item.x(), item.y())
+                attrs['color'] = qcolor_to_hex(item.color)
+            nodes_out.append({**attrs, "id": name})
+        return graph_to_node_link(self.graph, nodes_out)
 
     @error_handler("导入JSON时出错")
     def import_map_json(self):
@@ -2674,18 +3259,17 @@ class MindMapApp(QMainWindow):
             return
         
         try:
-            with open(file_name, "r", encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_json_file(file_name)
             
             # 处理不同格式的JSON文件
             if isinstance(data, dict) and "type" in data and data["type"] == "mindmap":
                 # 新格式：包含元数据的思维导图
                 graph_data = data.get("data", {})
-                g = nx.node_link_graph(graph_data, edges="links")
+                g = node_link_to_graph(graph_data)
                 root_node = data.get("root_node")
             else:
                 # 旧格式或标准格式
-                g = nx.node_link_graph(data, edges="links")
+                g = node_link_to_graph(data)
                 root_node = None
             
             # 处理图数据
@@ -2702,7 +3286,7 @@ class MindMapApp(QMainWindow):
             if root_node and root_node in self.nodes:
                 self.root_node_name = root_node
             elif self.nodes:
-                self.root_node_name = list(self.nodes.keys())[0]
+                self.root_node_name = next(iter(self.nodes))
             
             self.push_history("import_json")
             QMessageBox.information(self, "成功", "JSON 导入成功！")
@@ -2717,13 +3301,11 @@ class MindMapApp(QMainWindow):
             QMessageBox.warning(self, "错误", "没有内容可以导出！")
             return
         
-        self._sync_graph_from_scene()
-        
         # 构建兼容大纲视图的数据结构
         export_data = {
             "type": "mindmap",
             "version": "2.0",
-            "data": nx.node_link_data(self.graph, edges="links"),
+            "data": self._synced_node_link(),
             "root_node": self.root_node_name,
             "metadata": {
                 "export_time": QDateTime.currentDateTime().toString(Qt.ISODate),
@@ -2739,8 +3321,7 @@ class MindMapApp(QMainWindow):
             return
         
         try:
-            with open(file_name, "w", encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            write_json_file(file_name, export_data)
             QMessageBox.information(self, "成功", "JSON 导出成功！")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"导出失败：{e}")
@@ -2755,19 +3336,20 @@ class MindMapApp(QMainWindow):
             text = Path(file_name).read_text(encoding='utf-8')
             used = set(); nodes = []; edges = []
             stack = []
-            lines = text.splitlines()
+            next_suffix = {}  # base -> 下次尝试的编号；used 只增不减，最小空闲编号不会回退
             def ensure_unique(nm):
                 base = nm.strip() or "节点"
                 if base not in used:
                     used.add(base); return base
-                i = 1
+                i = next_suffix.get(base, 1)
                 while True:
                     cand = f"{base} {i}"
                     if cand not in used:
-                        used.add(cand); return cand
+                        used.add(cand); next_suffix[base] = i + 1; return cand
                     i += 1
-            for raw in lines:
-                m = re.match(r"^(\s*)([-*+])\s+(.*\S)\s*$", raw)
+            match_item = _MD_ITEM_RE.match
+            for raw in text.splitlines():
+                m = match_item(raw)
                 if not m: continue
                 indent = len(m.group(1).replace('\t','    '))
                 name = ensure_unique(m.group(3))
@@ -2798,11 +3380,10 @@ class MindMapApp(QMainWindow):
                 root = nodes[0] if nodes else None
                 self.arrange_tree(root=root)
                 if self.nodes:
-                    self.root_node_name = list(self.nodes.keys())[-1]
+                    self.root_node_name = next(reversed(self.nodes))
                     
                 # 清空层级缓存
-                if hasattr(self, '_node_level_cache'):
-                    self._node_level_cache.clear()
+                self._invalidate_node_levels()
                     
                 self.push_history("import_md")
                 QMessageBox.information(self, "成功", "Markdown 导入成功！")
@@ -2828,31 +3409,53 @@ class MindMapApp(QMainWindow):
         if not self.graph.nodes:
             QMessageBox.warning(self, "错误", "没有内容可以导出！")
             return
-        def bfs_tree_lines(root):
-            T = nx.bfs_tree(self.graph, root)
-            children = defaultdict(list)
-            for u, v in T.edges():
-                children[u].append(v)
-            for k in list(children.keys()):
-                children[k].sort(key=lambda s: s.lower())
-            lines = []
-            def rec(n, d):
-                lines.append("  "*d + "- " + n)
-                for c in children.get(n, []):
-                    rec(c, d+1)
-            rec(root, 0)
-            return lines
+        adj = self.graph.adj
         roots = []
         if self.selected_node:
             roots = [self.selected_node.name]
         else:
-            for comp in nx.connected_components(self.graph):
-                comp = list(comp)
-                root = min(comp, key=lambda x: self.graph.degree[x])
+            # 一趟遍历同时划分连通分量并选出各分量中度数最小的节点作根（自环按 networkx 的约定计两度）
+            seen = set()
+            for start in adj:
+                if start in seen:
+                    continue
+                seen.add(start)
+                queue = deque([start])
+                root, root_deg = None, None
+                while queue:
+                    n = queue.popleft()
+                    nbrs = adj[n]
+                    deg = len(nbrs) + (n in nbrs)
+                    if root is None or deg < root_deg:
+                        root, root_deg = n, deg
+                    for c in nbrs:
+                        if c not in seen:
+                            seen.add(c)
+                            queue.append(c)
                 roots.append(root)
+        # 所有根共用一趟 BFS 建出孩子表（每个连通分量只走一次），孩子按小写名排好序
+        children = {}
+        seen = set(roots)
+        for r in roots:
+            queue = deque([r])
+            while queue:
+                n = queue.popleft()
+                kids = [c for c in adj[n] if c not in seen]
+                seen.update(kids)
+                queue.extend(kids)
+                if kids:
+                    kids.sort(key=str.lower)
+                    children[n] = kids
         all_lines = []
         for r in roots:
-            all_lines.extend(bfs_tree_lines(r))
+            # 显式栈做先序遍历，深层树也不会触及递归上限
+            stack = [(r, 0)]
+            while stack:
+                n, d = stack.pop()
+                all_lines.append("  "*d + "- " + n)
+                kids = children.get(n)
+                if kids:
+                    stack.extend((c, d + 1) for c in reversed(kids))
             all_lines.append("")
         md_text = "\n".join(all_lines).rstrip()+"\n"
         file_name, _ = QFileDialog.getSaveFileName(self, "导出为 Markdown", "mindmap.md", "Markdown 文件 (*.md *.markdown)")
@@ -2866,6 +3469,23 @@ class MindMapApp(QMainWindow):
             logger.error(f"导出Markdown失败: {e}")
             QMessageBox.critical(self, "错误", f"导出失败：{e}")
 
+    def _bfs_children(self, root: str) -> Dict[str, List[str]]:
+        """以 root 为根的 BFS 树子节点表（兄弟按名称忽略大小写排序），直接走邻接表，不构造 nx 的有向树"""
+        adj = self.graph.adj
+        children = defaultdict(list)
+        seen = {root}
+        q = deque([root])
+        while q:
+            u = q.popleft()
+            for v in adj[u]:
+                if v not in seen:
+                    seen.add(v)
+                    children[u].append(v)
+                    q.append(v)
+        for ch in children.values():
+            ch.sort(key=str.lower)
+        return children
+
     @performance_monitor
     @error_handler("径向排列时出错")
     def arrange_radial(self, root=None):
@@ -2876,6 +3496,7 @@ class MindMapApp(QMainWindow):
         # 动态计算最小弦长：基于节点实际大小
         avg_diagonal = self._calculate_average_node_size()
         MIN_CHORD = avg_diagonal * 1.5 * self.MIN_CHORD_RATIO
+        HALF_MIN_CHORD = MIN_CHORD * 0.5
         
         MAX_CONE_NONROOT = math.radians(self.RADIAL_MAX_CONE)
         PAD_ARC = math.radians(self.RADIAL_PAD_ARC)
@@ -2890,19 +3511,12 @@ class MindMapApp(QMainWindow):
             root = effective_root
         self.set_root_node(root)
 
-        try:
-            T = nx.bfs_tree(self.graph, root)
-        except nx.NetworkXError:
-            T = nx.bfs_tree(self.graph, effective_root)
-
-        children = defaultdict(list)
-        for u, v in T.edges():
-            children[u].append(v)
-        for k in children:
-            children[k].sort(key=lambda s: s.lower())
+        children = self._bfs_children(root)
 
-        center = self.view.mapToScene(self.view.viewport().rect().center())
-        self._set_node_pos(root, self._snap(center))
+        center = self.view.viewport_center_scene()
+        placed = {root: self._snap(center)}  # 先收集，排列完一次性落位
+        cx, cy = center.x(), center.y()
+        cos, sin = math.cos, math.sin
 
         angle_of = {root: 0.0}
         radius_of = {root: 0.0}
@@ -2920,14 +3534,23 @@ class MindMapApp(QMainWindow):
                 e = mid + min(cone_width, (a1 - a0)) * 0.25
             return s, e
 
-        def delta_required(rad):
-            x = min(0.999999, max(0.0, MIN_CHORD / max(1e-6, 2.0 * rad)))
-            return 2.0 * math.asin(x)
+        # 各层半径按 RING/STRETCH_STEP 递进，兄弟间大量重复；按半径缓存，每次排列重新开始
+        # 缓存的是所需角距的倒数，容量 = int(扇区宽 * 倒数) + 1，循环里只剩乘法
+        inv_need_cache = {}
+
+        def inv_need(rad):
+            v = inv_need_cache.get(rad)
+            if v is None:
+                x = HALF_MIN_CHORD / rad if rad > 5e-7 else HALF_MIN_CHORD * 2e6
+                x = 0.999999 if x > 0.999999 else (x if x > 0.0 else 0.0)
+                v = inv_need_cache[rad] = 1.0 / (2.0 * math.asin(x))
+            return v
 
-        def assign(n: str, depth: int, a0: float, a1: float, r_parent: float):
+        def assign(n: str, depth: int, a0: float, a1: float, r_parent: float) -> list:
+            """摆放 n 的子节点，返回各子节点待处理的 (节点, 深度, 扇区起, 扇区止, 半径) 帧"""
             ch = children.get(n, [])
             if not ch:
-                return
+                return []
 
             parent_dir = angle_of.get(n, (a0 + a1) / 2.0)
             if depth == 0:
@@ -2945,8 +3568,7 @@ class MindMapApp(QMainWindow):
                 ring_of_idx = [0]
                 ring_radii = [r_base]
             else:
-                need = delta_required(r_base)
-                cap_base = int(usable_width / need) + 1
+                cap_base = int(usable_width * inv_need(r_base)) + 1
 
                 ring_radii = [r_base]
                 counts = []
@@ -2958,8 +3580,7 @@ class MindMapApp(QMainWindow):
                     stretched_cap = cap_base
                     while stretched_cap < m and extra < MAX_EXTRA_STRETCH:
                         extra += STRETCH_STEP
-                        need2 = delta_required(r_base + extra)
-                        stretched_cap = int(usable_width / need2) + 1
+                        stretched_cap = int(usable_width * inv_need(r_base + extra)) + 1
                     if stretched_cap >= m:
                         ring_radii[0] = r_base + extra
                         counts = [m]
@@ -2969,7 +3590,7 @@ class MindMapApp(QMainWindow):
                         ring_radii = [r_base]
                         while total < m and len(ring_radii) < MAX_RINGS_PER_LEVEL:
                             cur_r = ring_radii[-1]
-                            cap = int(usable_width / delta_required(cur_r)) + 1
+                            cap = int(usable_width * inv_need(cur_r)) + 1
                             if cap < 2 and (m - total) > 1:
                                 cap = 2
                             put = min(cap, m - total)
@@ -2981,11 +3602,11 @@ class MindMapApp(QMainWindow):
                         if total < m:
                             need_more = m - total
                             last_r = ring_radii[-1]
-                            cap_last = int(usable_width / delta_required(last_r)) + 1
+                            cap_last = int(usable_width * inv_need(last_r)) + 1
                             extra2 = 0.0
                             while cap_last < need_more and extra2 < MAX_EXTRA_STRETCH:
                                 extra2 += STRETCH_STEP
-                                cap_last = int(usable_width / delta_required(last_r + extra2)) + 1
+                                cap_last = int(usable_width * inv_need(last_r + extra2)) + 1
                             ring_radii[-1] = last_r + extra2
                             counts.append(need_more)
                             total += need_more
@@ -2996,20 +3617,14 @@ class MindMapApp(QMainWindow):
                 else:
                     angles = [(use_a0 + use_a1) / 2.0]
 
-                ring_of_idx = []
-                idx = 0
-                for ring_i, cnt in enumerate(counts):
-                    for _ in range(cnt):
-                        ring_of_idx.append(ring_i)
-                        idx += 1
-
-            for idx, c in enumerate(ch):
-                ang = angles[idx]
-                r_child = ring_radii[ring_of_idx[idx]]
-                x = center.x() + r_child * math.cos(ang)
-                y = center.y() + r_child * math.sin(ang)
-                p = self._snap(QPointF(x, y))
-                self._set_node_pos(c, p)
+                ring_of_idx = [ring_i for ring_i, cnt in enumerate(counts) for _ in range(cnt)]
+
+            # 先整批算出各子节点的半径与坐标，再逐个交给 Qt（吸附/设位置仍需逐个调用）
+            r_childs = [ring_radii[i] for i in ring_of_idx]
+            xs = [cx + r * cos(a) for r, a in zip(r_childs, angles)]
+            ys = [cy + r * sin(a) for r, a in zip(r_childs, angles)]
+            for c, ang, r_child, x, y in zip(ch, angles, r_childs, xs, ys):
+                placed[c] = self._snap(QPointF(x, y))
                 angle_of[c] = ang
                 radius_of[c] = r_child
 
@@ -3024,15 +3639,20 @@ class MindMapApp(QMainWindow):
                     boundaries.append((mids[i] + PAD_ARC * 0.5, mids[i+1] - PAD_ARC * 0.5))
                 boundaries.append((mids[-1] + PAD_ARC * 0.5, use_a1))
 
-            for (c, (sa0, sa1), idx) in zip(ch, boundaries, range(len(ch))):
-                assign(c, depth + 1, sa0, sa1, ring_radii[ring_of_idx[idx]])
+            return [(c, depth + 1, sa0, sa1, r_child)
+                    for c, (sa0, sa1), r_child in zip(ch, boundaries, r_childs)]
 
-        assign(root, 0, 0.0, twopi, 0.0)
+        # 显式栈代替递归：深层大纲不会触发 RecursionError；子帧逆序入栈，处理顺序与递归一致
+        stack = [(root, 0, 0.0, twopi, 0.0)]
+        while stack:
+            frames = assign(*stack.pop())
+            frames.reverse()
+            stack.extend(frames)
 
+        self._set_node_positions(placed)
         self.update_all_edges()
         # 清空层级缓存
-        if hasattr(self, '_node_level_cache'):
-            self._node_level_cache.clear()
+        self._invalidate_node_levels()
         self.push_history("arrange_radial")
         logger.info("完成径向排列")
 
@@ -3045,17 +3665,7 @@ class MindMapApp(QMainWindow):
         if root is None or root not in self.graph:
             root = effective_root
         self.set_root_node(root)
-        try:
-            T = nx.bfs_tree(self.graph, root)
-        except nx.NetworkXError:
-            root = effective_root
-            T = nx.bfs_tree(self.graph, root)
-
-        children = defaultdict(list)
-        for u, v in T.edges():
-            children[u].append(v)
-        for k in children:
-            children[k].sort(key=lambda s: s.lower())
+        children = self._bfs_children(root)
 
         # 使用用户设置的参数作为间距
         x_spacing = self.TARGET_EDGE
@@ -3063,60 +3673,68 @@ class MindMapApp(QMainWindow):
         pos = {}
         order = 0
 
-        def dfs(n, depth=0):
-            nonlocal order
-            ch = children.get(n, [])
+        # 显式栈做后序遍历：第一次弹出时压回自身（已展开）再压子节点，子节点都定位后再取其均值
+        stack = [(root, 0, False)]
+        while stack:
+            n, depth, expanded = stack.pop()
+            ch = children.get(n)
             if not ch:
                 pos[n] = (order * x_spacing, depth * y_spacing)
                 order += 1
-            else:
-                for c in ch:
-                    dfs(c, depth + 1)
+            elif expanded:
                 xs = [pos[c][0] for c in ch]
                 pos[n] = (sum(xs) / len(xs), depth * y_spacing)
+            else:
+                stack.append((n, depth, True))
+                stack.extend((c, depth + 1, False) for c in reversed(ch))
 
-        dfs(root, 0)
-
-        center = self.view.mapToScene(self.view.viewport().rect().center())
+        center = self.view.viewport_center_scene()
         if pos:
             xs = [p[0] for p in pos.values()]
             ys = [p[1] for p in pos.values()]
             cx = (min(xs) + max(xs)) / 2
             cy = (min(ys) + max(ys)) / 2
-            for n, (x, y) in pos.items():
-                self._set_node_pos(n, self._snap(QPointF(center.x() + (x - cx), center.y() + (y - cy))))
+            ox, oy = center.x() - cx, center.y() - cy
+            self._set_node_positions({n: self._snap(QPointF(x + ox, y + oy)) for n, (x, y) in pos.items()})
         else:
-            self._set_node_pos(root, self._snap(center))
+            self._set_node_positions({root: self._snap(center)})
 
         self.update_all_edges()
         # 清空层级缓存
-        if hasattr(self, '_node_level_cache'):
-            self._node_level_cache.clear()
+        self._invalidate_node_levels()
         self.push_history("arrange_tree")
         logger.info("完成树形排列")
 
-    def _set_node_pos(self, n, p: QPointF):
-        if n in self.nodes:
-            self.nodes[n].setPos(p)
-            if self.graph.has_node(n):
-                self.graph.nodes[n]['pos'] = (p.x(), p.y())
-            try:
-                if hasattr(self, '_spatial'):
-                    old = self._pos_cache.get(n, (self.nodes[n].x(), self.nodes[n].y()))
-                    self._spatial.move(n, old[0], old[1], p.x(), p.y())
-                self._pos_cache[n] = (p.x(), p.y())
-            except Exception:
-                pass
+    def _set_node_positions(self, positions: Dict[str, QPointF]):
+        """批量落位：期间屏蔽节点的 moved 信号，免得每个节点各触发一轮连线/空间哈希/定时器；
+        结束后统一重建空间哈希、递增图版本，连线由调用方 update_all_edges 一次刷新"""
+        nodes = self.nodes
+        graph_nodes = self.graph.nodes
+        pos_cache = self._pos_cache
+        items = [(n, nodes[n], p) for n, p in positions.items() if n in nodes]
+        for _, item, _ in items:
+            item.blockSignals(True)
+        try:
+            for n, item, p in items:
+                item.setPos(p)
+                xy = (p.x(), p.y())
+                if n in graph_nodes:
+                    graph_nodes[n]['pos'] = xy
+                pos_cache[n] = xy
+        finally:
+            for _, item, _ in items:
+                item.blockSignals(False)
+        self._rebuild_spatial_hash()
+        self._bump_graph_version()
 
     def snapshot(self):
-        self._sync_graph_from_scene()
-        data = nx.node_link_data(self.graph, edges="links")
+        data = self._synced_node_link()
         selected = self.selected_node.name if self.selected_node else None
         return {"data": data, "selected": selected, "root_node": self.root_node_name}
 
     def load_snapshot(self, snap):
         try:
-            g = nx.node_link_graph(snap["data"], edges="links") if isinstance(snap, dict) else nx.node_link_graph(snap, edges="links")
+            g = node_link_to_graph(snap["data"]) if isinstance(snap, dict) else node_link_to_graph(snap)
             self.graph = g
             self.refresh_scene()
             sel = snap.get("selected") if isinstance(snap, dict) else None
@@ -3125,26 +3743,24 @@ class MindMapApp(QMainWindow):
             if isinstance(snap, dict) and "root_node" in snap and snap["root_node"] in self.nodes:
                 self.root_node_name = snap["root_node"]
             elif self.nodes:
-                self.root_node_name = list(self.nodes.keys())[-1]
+                self.root_node_name = next(reversed(self.nodes))
         except Exception as e:
             logger.error(f"加载快照失败: {e}")
 
     def push_history(self, reason: str = ""):
-        """保存历史记录，确保状态一致性"""
-        # 确保场景状态与图数据同步
-        self._sync_graph_from_scene()
-        
+        """保存历史记录，确保状态一致性（场景到图的同步由 snapshot 一并完成）"""
         # 当图结构变化时，清空层级缓存
-        if reason in ["add_child", "delete", "connect", "disconnect", "import_json", "import_md", "arrange_radial", "arrange_tree"]:
-            if hasattr(self, '_node_level_cache'):
-                self._node_level_cache.clear()
+        if reason in ["delete", "connect", "disconnect", "import_json", "import_md", "arrange_radial", "arrange_tree"]:
+            self._invalidate_node_levels()
                 
         snap = self.snapshot()
+        # 与栈顶完全相同（如拖回原位、重复设置同一颜色）时不再追加，避免无效快照占满历史
+        if self.undo_stack and self.undo_stack[-1] == snap:
+            logger.debug(f"历史记录无变化，跳过: {reason}")
+            return
         self.undo_stack.append(snap)
-        if len(self.undo_stack) > self.HISTORY_LIMIT:
-            self.undo_stack.pop(0)
         self.redo_stack.clear()
-        self._autosave_timer.start(150)
+        self._schedule_autosave()
         logger.debug(f"历史记录已保存: {reason}")
 
     def undo(self):
@@ -3154,7 +3770,7 @@ class MindMapApp(QMainWindow):
         self.redo_stack.append(last)
         prev = self.undo_stack[-1]
         self.load_snapshot(prev)
-        self._autosave_timer.start(100)
+        self._schedule_autosave()
         logger.debug("执行撤销操作")
 
     def redo(self):
@@ -3163,14 +3779,16 @@ class MindMapApp(QMainWindow):
         s = self.redo_stack.pop()
         self.undo_stack.append(s)
         self.load_snapshot(s)
-        self._autosave_timer.start(100)
+        self._schedule_autosave()
         logger.debug("执行重做操作")
 
+    def _schedule_autosave(self):
+        """（重新）开始自动保存倒计时，间隔取 AUTOSAVE_DELAY；连续修改只在停顿后保存一次。"""
+        self._autosave_timer.start(int(self.AUTOSAVE_DELAY))
+
     def autosave(self):
         try:
-            self._sync_graph_from_scene()
-            data = nx.node_link_data(self.graph, edges="links")
-            Path(AUTOSAVE_PATH).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+            write_json_file_atomic(AUTOSAVE_PATH, self._synced_node_link())
             logger.debug("自动保存完成")
         except Exception as e:
             logger.error(f"自动保存失败: {e}")
@@ -3179,6 +3797,8 @@ class MindMapApp(QMainWindow):
     def refresh_scene(self):
         """安全的场景刷新"""
         try:
+            # 图可能整体替换（撤销/重做/导入），层级与邻居角度缓存一并作废
+            self._invalidate_node_levels()
             current_selection = self.selected_node.name if self.selected_node else None
             
             if hasattr(self, 'scene'):
@@ -3196,9 +3816,12 @@ class MindMapApp(QMainWindow):
                 
             self.nodes.clear()
             self.edges.clear()
+            # 坐标镜像随节点整体重建，旧坐标不能留到新节点上
+            self._pos_cache.clear()
 
             if not self.graph.nodes:
                 self.root_node_name = None
+                self._rebuild_spatial_hash()
                 self.refresh_node_list()
                 return
 
@@ -3218,19 +3841,20 @@ class MindMapApp(QMainWindow):
                     corner_radius=int(rdefs.get('NODE_CORNER_RADIUS', getattr(self, 'NODE_CORNER_RADIUS', 12)))
                 )
                 node_item.moved.connect(self._on_node_moved)
-                node_item.color_changed.connect(lambda _ni, n=name: self._on_node_color_changed(n))
+                node_item.color_changed.connect(lambda ni: self._on_node_color_changed(ni.name))
                 node_item.renamed.connect(self._on_node_renamed)
                 x, y = attrs.get('pos', (0.0, 0.0))
                 node_item.setPos(float(x), float(y))
                 self.scene.addItem(node_item)
-                self.nodes[name] = node_item
+                self.nodes[node_item.name] = node_item
+            self._rebuild_spatial_hash()
 
             for u, v in self.graph.edges:
                 if u in self.nodes and v in self.nodes:
                     self.create_edge(self.nodes[u], self.nodes[v])
 
             if self.root_node_name is None and self.nodes:
-                self.root_node_name = list(self.nodes.keys())[0]
+                self.root_node_name = next(iter(self.nodes))
                 
             if current_selection and current_selection in self.nodes:
                 self.select_node(self.nodes[current_selection])
@@ -3245,6 +3869,16 @@ class MindMapApp(QMainWindow):
             self.nodes.clear()
             self.edges.clear()
 
+    def closeEvent(self, event):
+        # 退出前落实尚在等待中的历史记录与自动保存
+        if self._history_timer.isActive():
+            self._history_timer.stop()
+            self.push_history("move")
+        if self._autosave_timer.isActive():
+            self._autosave_timer.stop()
+            self.autosave()
+        super().closeEvent(event)
+
 # ---------------------------- 大纲数据结构 ----------------------------
 
 # ------------------------------------------------------------------
@@ -3273,7 +3907,7 @@ class OutlineNode:
 # ------------------------------------------------------------------
 class OutlineCodec:
     """负责把“缩进文本/JSON”与 OutlineNode 树互转的工具集合。"""
-    BULLET_PREFIXES = ["- ", "* ", "+ "]
+    BULLET_PREFIXES = ("- ", "* ", "+ ")
     @staticmethod
     def _expand_tabs(s: str, tab_size: int = 4) -> str:
         return s.expandtabs(tab_size)
@@ -3291,10 +3925,9 @@ class OutlineCodec:
         - 编号：1. / 2) / 3、 等
         """
         s = s.lstrip()
-        for p in BULLET_PREFIXES:
-            if s.startswith(p):
-                return s[len(p):].strip()
-        m = re.match(r"^\d+[\.\)、]\s*", s)
+        if s.startswith(BULLET_PREFIXES):  # 各符号前缀均为两个字符
+            return s[2:].strip()
+        m = _OUTLINE_NUMBER_RE.match(s)
         if m:
             return s[m.end():].strip()
         return s.strip()
@@ -3315,17 +3948,12 @@ class OutlineCodec:
                 indents.append(n)
         if not indents:
             return INDENT_SPACES
-        diffs, si = [], sorted(indents)
-        for i in range(1, len(si)):
-            d = si[i] - si[i - 1]
-            if d > 0:
-                diffs.append(d)
+        # 去重后排序，相邻差值均为正；公约数交给 C 实现的 math.gcd 逐个归约
+        si = sorted(set(indents))
+        diffs = list(map(sub, islice(si, 1, None), si))
         if not diffs:
             return INDENT_SPACES
-        from math import gcd
-        g = diffs[0]
-        for d in diffs[1:]:
-            g = gcd(g, d)
+        g = reduce(math.gcd, diffs)
         return max(1, min(g, 8))
 
     @staticmethod
@@ -3337,7 +3965,9 @@ class OutlineCodec:
         lines = outline_text.splitlines()
         unit = OutlineCodec._infer_indent_unit(lines)
         root = OutlineNode("ROOT")
-        stack: List[Tuple[int, OutlineNode]] = [(-1, root)]
+        # 祖先链：层级严格递增（缩进可跳级，故不能直接按层级下标），二分定位后一次切片截断
+        levels: List[int] = [-1]
+        stack: List[OutlineNode] = [root]
         for raw in lines:
             if not raw.strip():
                 continue
@@ -3347,10 +3977,11 @@ class OutlineCodec:
             if not title:  # 跳过空标题
                 continue
             node = OutlineNode(title=title)
-            while stack and stack[-1][0] >= level:
-                stack.pop()
-            stack[-1][1].children.append(node)
-            stack.append((level, node))
+            keep = bisect_left(levels, level)
+            del levels[keep:], stack[keep:]
+            stack[-1].children.append(node)
+            levels.append(level)
+            stack.append(node)
         return root
 
     @staticmethod
@@ -3360,10 +3991,14 @@ class OutlineCodec:
         - bullet="- " => 标准 Markdown 列表
         - bullet=""   => 非标准（仅空格缩进）
         """
+        bullet = bullet or ""
+        pads: List[str] = []  # pads[d] 为第 d 层的缩进串，按需增长，同层各行共用
         def dfs(n: OutlineNode, depth: int, out: List[str]):
+            if depth == len(pads):
+                pads.append(" " * (depth * indent_spaces))
+            pad = pads[depth]
             for c in n.children:
-                line = " " * (depth * indent_spaces) + (bullet + c.title if bullet else c.title)
-                out.append(line)
+                out.append(f"{pad}{bullet}{c.title}")
                 dfs(c, depth + 1, out)
         buf: List[str] = []
         dfs(root, 0, buf)
@@ -3419,7 +4054,7 @@ class TitleDelegate(QStyledItemDelegate):
 
     def setModelData(self, editor, model, index):
         """保存编辑结果时，去掉用户误打的前置编号。"""
-        text = re.sub(r"^\d+(?:\.\d+)*\s+", "", editor.text()).strip()
+        text = _AUTO_NUMBER_RE.sub("", editor.text()).strip()
         model.setData(index, text, TITLE_ROLE)
         model.setData(index, text, Qt.DisplayRole)
 
@@ -3595,7 +4230,7 @@ class OutlineViewWindow(QMainWindow):
         menu_bg = ("qlineargradient(x1:0,y1:0, x2:1,y2:0, stop:0 #f59e0b, stop:0.16 #ef4444, stop:0.33 #8b5cf6, stop:0.5 #06b6d4, stop:0.66 #10b981, stop:0.83 #22c55e, stop:1 #3b82f6)"
                    if is_rainbow or theme in ("马卡龙","多彩","霓虹") else panel_bg)
 
-        self.setStyleSheet(f"""
+        css = f"""
             QMainWindow {{ background: {window_bg}; }}
             QWidget {{ color:{text}; }}
             QTextEdit, QTreeWidget {{ background:{panel_bg}; border:1px solid {border}; border-radius:12px; }}
@@ -3608,7 +4243,10 @@ class OutlineViewWindow(QMainWindow):
             QMenu::separator {{ height: 1px; margin: 6px 8px; background: {accent}; }}
             QMenu::item {{ padding: 6px 14px; background: transparent; }}
             QMenu::item:selected {{ background: {accent}55; border-radius: 6px; }}
-        """)
+        """
+        # 主题/点缀色未变时不重设样式表，免去整棵子控件树的样式重算
+        if css != self.styleSheet():
+            self.setStyleSheet(css)
 
         pal = self.palette()
         pal.setColor(QPalette.AlternateBase, QColor(alt_bg if not theme=="马卡龙" else "#fce7f3"))
@@ -3670,7 +4308,7 @@ class OutlineViewWindow(QMainWindow):
         """将网络图转换为大纲文本格式"""
         if not root_node_name or root_node_name not in graph:
             # 如果没有有效根节点，使用第一个节点
-            root_node_name = list(graph.nodes())[0] if graph.nodes else ""
+            root_node_name = next(iter(graph), "")
             
         if not root_node_name:
             return ""
@@ -3681,12 +4319,12 @@ class OutlineViewWindow(QMainWindow):
         node_children = {}
         
         # BFS遍历
-        queue = [(root_node_name, 0)]
+        queue = deque([(root_node_name, 0)])
         visited.add(root_node_name)
         node_levels[root_node_name] = 0
         
         while queue:
-            current_node, level = queue.pop(0)
+            current_node, level = queue.popleft()
             
             # 获取邻居节点（子节点）
             neighbors = list(graph.neighbors(current_node))
@@ -4395,7 +5033,7 @@ class OutlineViewWindow(QMainWindow):
         - 若标题为空 => 删除节点（杜绝“数字占位”）
         - 然后刷新编号并同步回编辑器
         """
-        new_text = re.sub(r"^\d+(?:\.\d+)*\s+", "", item.text(0)).strip()
+        new_text = _AUTO_NUMBER_RE.sub("", item.text(0)).strip()
         if not new_text:
             self.tree.blockSignals(True)
             parent = item.parent()